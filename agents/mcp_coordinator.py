@@ -11,6 +11,7 @@ import uuid
 from typing import Dict, List, Any, Optional
 from utils.mcp import MessageType, broker
 from utils.mcp_client import MCPAgent
+from utils.semantic_cache import SemanticCache
 from .mcp_ingestion_agent import MCPIngestionAgent
 from .mcp_retrieval_agent import MCPRetrievalAgent
 from .mcp_llm_agent import MCPLLMAgent
@@ -55,6 +56,9 @@ class MCPCoordinatorAgent(MCPAgent):
         # Active workflows
         self.active_workflows: Dict[str, Dict[str, Any]] = {}
         
+        # Answers for repeated and near-duplicate queries
+        self.semantic_cache = SemanticCache(similarity_threshold=0.95, max_entries=256)
+        
         # Register message handlers
         self._register_handlers()
         
@@ -78,6 +82,8 @@ class MCPCoordinatorAgent(MCPAgent):
         # Workflow responses
         self.mcp.register_handler(MessageType.DOCUMENTS_INDEXED.value, self.handle_documents_indexed)
         self.mcp.register_handler(MessageType.RESPONSE_GENERATED.value, self.handle_response_generated)
+        self.mcp.register_handler(MessageType.RESPONSE_CHUNK.value, self.handle_response_chunk)
+        self.mcp.register_handler(MessageType.ERROR.value, self.handle_error)
         
         # System messages
         self.mcp.register_handler(MessageType.SYSTEM_STATUS.value, self.handle_system_status_request)
@@ -205,6 +211,9 @@ class MCPCoordinatorAgent(MCPAgent):
     def handle_documents_indexed(self, message):
         """Handle documents indexed response from retrieval agent"""
         try:
+            # New content can change any answer, so drop cached ones
+            self.semantic_cache.clear()
+            
             workflow_id = message.workflow_id
             if not workflow_id or workflow_id not in self.active_workflows:
                 logger.warning(f"Received documents indexed message without valid workflow: {workflow_id}")
@@ -272,10 +281,22 @@ class MCPCoordinatorAgent(MCPAgent):
             error_msg = f"Error handling documents indexed: {str(e)}"
             logger.error(error_msg, exc_info=True)
     
+    def handle_response_chunk(self, message):
+        """Handle a partial response streamed by the LLM agent"""
+        workflow_id = message.workflow_id or message.metadata.get("workflow_id")
+        if not workflow_id or workflow_id not in self.active_workflows:
+            logger.debug(f"Received response chunk without valid workflow: {workflow_id}")
+            return
+        
+        # Keep the partial answer on the workflow until the full response arrives
+        workflow = self.active_workflows[workflow_id]
+        workflow["current_step"] = "generation"
+        workflow.setdefault("response_chunks", []).append(message.payload.get("delta", ""))
+    
     def handle_response_generated(self, message):
         """Handle response generated from LLM agent"""
         try:
-            workflow_id = message.workflow_id
+            workflow_id = message.workflow_id or message.metadata.get("workflow_id")
             if not workflow_id or workflow_id not in self.active_workflows:
                 logger.warning(f"Received response generated message without valid workflow: {workflow_id}")
                 return
@@ -311,17 +332,18 @@ class MCPCoordinatorAgent(MCPAgent):
             
             logger.info(f"Query processing workflow completed: {workflow_id} in {processing_time:.2f}s")
             
-            # Send response to original sender
-            self.mcp.send(
-                receiver=workflow["original_sender"],
-                msg_type=MessageType.RESPONSE_GENERATED.value,
-                payload={
-                    **message.payload,
-                    "workflow_id": workflow_id,
-                    "total_processing_time": processing_time
-                },
-                trace_id=workflow["original_trace_id"]
-            )
+            # Send response to original sender (unless the coordinator started the workflow itself)
+            if workflow["original_sender"] != self.agent_id:
+                self.mcp.send(
+                    receiver=workflow["original_sender"],
+                    msg_type=MessageType.RESPONSE_GENERATED.value,
+                    payload={
+                        **message.payload,
+                        "workflow_id": workflow_id,
+                        "total_processing_time": processing_time
+                    },
+                    trace_id=workflow["original_trace_id"]
+                )
             
             # Send workflow completion notification
             self.mcp.send(
@@ -343,6 +365,27 @@ class MCPCoordinatorAgent(MCPAgent):
             error_msg = f"Error handling response generated: {str(e)}"
             logger.error(error_msg, exc_info=True)
     
+    def handle_error(self, message):
+        """Handle a sub-agent error by failing and removing the workflow it belongs to"""
+        error = message.error or message.payload.get("error", "Unknown error")
+        workflow_id = message.workflow_id or message.metadata.get("workflow_id")
+        if not workflow_id or workflow_id not in self.active_workflows:
+            logger.warning(f"Received error from {message.sender} without valid workflow: {error}")
+            return
+        
+        workflow = self.active_workflows.pop(workflow_id)
+        workflow["status"] = "failed"
+        workflow["error"] = error
+        workflow["completed_at"] = time.time()
+        logger.error(f"Workflow {workflow_id} failed in {message.sender}: {error}")
+        
+        # Send error to original sender (unless the coordinator started the workflow itself)
+        if workflow["original_sender"] != self.agent_id:
+            self.mcp.send_error(
+                receiver=workflow["original_sender"],
+                error_msg=f"Query processing failed: {error}"
+            )
+    
     def handle_system_status_request(self, message):
         """Handle system status requests"""
         try:
@@ -405,6 +448,7 @@ class MCPCoordinatorAgent(MCPAgent):
             "ingestion": self.ingestion_agent.get_stats(),
             "retrieval": self.retrieval_agent.get_stats(),
             "llm": self.llm_agent.get_stats(),
+            "semantic_cache": self.semantic_cache.get_stats(),
             "broker": broker.get_stats()
         }
     
@@ -431,6 +475,79 @@ class MCPCoordinatorAgent(MCPAgent):
             "file_path": file_path
         }
     
+    def answer(self, query: str, k: int = 5, similarity_threshold: float = 0.7,
+               retrieval_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Retrieve context and generate a response in a single call
+        
+        Args:
+            query: Query string
+            k: Number of chunks to retrieve
+            similarity_threshold: Minimum similarity score
+            retrieval_result: Context already retrieved for this query (e.g. by
+                retrieve_contexts_batch), skipping the retrieval step
+            
+        Returns:
+            Generated response, or a result with status "empty" when no context was found;
+            errors carry "failed_step" ("retrieval" or "generation")
+        """
+        # Serve repeated and near-duplicate queries from the semantic cache,
+        # reusing the embedding computed during batch retrieval when there is one
+        query_vector = (retrieval_result or {}).get("query_embedding")
+        if query_vector is None:
+            try:
+                query_vector = self.retrieval_agent.embed_query(query)
+            except Exception as e:
+                logger.warning(f"Could not embed query for semantic cache lookup: {str(e)}")
+        
+        if query_vector is not None:
+            # Answers cached for a different search_k are not hits
+            cached = self.semantic_cache.lookup(
+                query_vector, matches=lambda entry: entry["search_k"] == k
+            )
+            if cached is not None:
+                return {**cached["result"], "cache_hit": True}
+        
+        if retrieval_result is None:
+            # Reuse the cache lookup's embedding instead of embedding the query again
+            retrieval_result = self.retrieval_agent.retrieve_context(
+                query, k=k, similarity_threshold=similarity_threshold,
+                query_embedding=query_vector
+            )
+        
+        if retrieval_result.get("status") == "error":
+            return {**retrieval_result, "failed_step": "retrieval"}
+        
+        collection_size = retrieval_result.get("collection_size", 0)
+        
+        if not retrieval_result.get("top_chunks"):
+            return {
+                "status": "empty",
+                "query": query,
+                "collection_size": collection_size
+            }
+        
+        llm_result = self.llm_agent.generate_response(
+            query=query,
+            context_chunks=retrieval_result["top_chunks"],
+            chunk_file_names=retrieval_result.get("chunk_file_names", [])
+        )
+        
+        result = {
+            **llm_result,
+            "collection_size": collection_size
+        }
+        
+        if result.get("status") == "error":
+            result["failed_step"] = "generation"
+        
+        # Only answers generated from the retrieved context are cached, never errors
+        if (result.get("status") == "success" and result.get("response_type") == "rag"
+                and query_vector is not None):
+            self.semantic_cache.add(query_vector, {"search_k": k, "result": result})
+        
+        return {**result, "cache_hit": False}
+    
     def answer_query(self, query: str, search_k: int = 5) -> Dict[str, Any]:
         """
         Answer a query (legacy method for backward compatibility)
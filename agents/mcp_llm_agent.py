@@ -5,65 +5,66 @@ This module implements an LLM agent that uses the Model Context Protocol (MCP)
 for generating responses using Google Gemini with retrieved context.
 """
 
+import asyncio
+import functools
+import io
+import itertools
 import logging
+import re
+import string
+import threading
 import time
 import os
-from typing import List, Dict, Any, Optional
+from types import MappingProxyType
+from typing import Callable, List, Dict, Any, Optional, Tuple
+import requests
 from dotenv import load_dotenv
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from config import config
 from utils.mcp import MessageType, broker
 from utils.mcp_client import MCPAgent
+from utils.rate_limiter import RateLimiter
+from utils.response_cache import ResponseCache
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Maximum number of Gemini requests in flight at once
+MAX_CONCURRENT_REQUESTS = 16
 
-class MCPLLMAgent(MCPAgent):
-    """
-    LLM agent that uses MCP for communication
+# A timer re-probes the API every minute, before the 90-second cached status expires,
+# so health checks after the first one never probe inline
+HEALTH_CACHE_SECONDS = 90
+HEALTH_REFRESH_SECONDS = 60
+GEMINI_MODELS_URL = "https://generativelanguage.googleapis.com/v1beta/models"
 
-    Handles response generation using Google Gemini
-    """
+# Retrieval results arriving within this window are answered in one Gemini request
+BATCH_WINDOW_SECONDS = 0.02
+MAX_BATCH_SIZE = 8
 
-    def __init__(self, api_url: Optional[str] = None):
-        """
-        Initialize LLM agent
+# After this many consecutive Gemini failures, calls fail fast until the recovery timeout passes
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RECOVERY_SECONDS = 30
 
-        Args:
-            api_url: URL of MCP REST API (None for in-memory only)
-        """
-        super().__init__("LLMResponseAgent", api_url)
+# Errors that mean the API itself failed; content errors such as blocked prompts do not count
+API_FAILURES = (google_exceptions.GoogleAPIError, OSError, asyncio.TimeoutError)
 
-        # Initialize Gemini
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
+# Context chunks are cut to this many characters (roughly 600 tokens) before prompt assembly
+MAX_CHARS_PER_CHUNK = 2500
 
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel("gemini-2.0-flash")
+# Response cleanup: header markers (with one optional preceding newline) and trailing whitespace
+HEADER_MARKER = re.compile(r"\n?##")
+TRAILING_WHITESPACE = re.compile(r"[^\S\n]+$", re.MULTILINE)
 
-        # Enhanced stats
-        self.stats.update(
-            {
-                "responses_generated": 0,
-                "rag_responses": 0,
-                "general_responses": 0,
-                "processing_errors": 0,
-                "total_tokens_used": 0,
-                "average_response_time": 0.0,
-            }
-        )
-
-        # Modern Response templates with structured format
-        self.templates = {
-            "rag_prompt": """You are an AI assistant that provides well-structured, modern responses based on uploaded documents. 
+# Line that starts each answer in a batched response
+BATCH_ANSWER_DELIMITER = re.compile(r"^=== ANSWER (\d+) ===[ \t]*$", re.MULTILINE)
 
-CONTEXT FROM UPLOADED FILES:
-{context}
 
-SOURCES: {sources}
+# Modern response templates with structured format
+_RAG_INSTRUCTIONS = """You are an AI assistant that provides well-structured, modern responses based on uploaded documents. 
 
-USER QUERY: {query}
+Each request gives you CONTEXT FROM UPLOADED FILES, the SOURCES of that context and the USER QUERY to answer from it.
 
 RESPONSE FORMAT REQUIREMENTS:
 1. Start with a brief definition/summary (2-3 sentences max)
@@ -97,11 +98,18 @@ If no tabular data, use bullet points for details]
 ## 💡 Summary
 [Brief conclusion or key takeaway]
 
-Remember: Keep it concise, well-structured, and easy to scan. Use emojis sparingly for section headers only.""",
+Remember: Keep it concise, well-structured, and easy to scan. Use emojis sparingly for section headers only."""
 
-            "general_prompt": """You are an AI assistant providing general knowledge responses.
+_RAG_PROMPT = """CONTEXT FROM UPLOADED FILES:
+{context}
 
-USER QUERY: {query}
+SOURCES: {sources}
+
+USER QUERY: {query}"""
+
+_GENERAL_INSTRUCTIONS = """You are an AI assistant providing general knowledge responses.
+
+Each request gives you the USER QUERY to answer.
 
 RESPONSE FORMAT REQUIREMENTS:
 1. Start with a brief definition/summary (2-3 sentences max)
@@ -130,9 +138,19 @@ STRUCTURE YOUR RESPONSE EXACTLY LIKE THIS:
 ## 💡 Summary
 [Brief conclusion or key takeaway]
 
-Note: This response is based on general knowledge. Upload relevant documents for more specific, document-based answers.""",
+Note: This response is based on general knowledge. Upload relevant documents for more specific, document-based answers."""
+
+_GENERAL_PROMPT = """USER QUERY: {query}"""
 
-            "error_response": """## ❌ Error Processing Request
+_BATCH_PROMPT = """Answer each of the following {count} requests independently, following your instructions for every answer.
+Begin the answer to request N with a line containing only "=== ANSWER N ===" and write nothing before the first answer.
+
+{requests}"""
+
+_BATCH_REQUEST = """=== REQUEST {number} ===
+{request}"""
+
+_ERROR_RESPONSE = """## ❌ Error Processing Request
 
 Something went wrong while handling your request.
 
@@ -146,9 +164,9 @@ Something went wrong while handling your request.
 • Try again in a few moments
 
 ## 💡 Need Help?
-If the problem persists, please contact support or try uploading your documents again.""",
+If the problem persists, please contact support or try uploading your documents again."""
 
-            "no_documents_response": """## 📋 General Knowledge Response
+_NO_DOCS_RESPONSE = """## 📋 General Knowledge Response
 
 I couldn't find any relevant uploaded documents for this query, so I'm providing a general response.
 
@@ -162,7 +180,159 @@ I couldn't find any relevant uploaded documents for this query, so I'm providing
 
 ## 💡 Tip
 Upload your documents to get more tailored, document-specific answers with exact references and data."""
-        }
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling Gemini while the circuit breaker is open"""
+
+
+def _compile_template(template: str) -> Callable[..., str]:
+    """
+    Pre-split a str.format template into its literal parts and field names
+
+    Args:
+        template: Template with {field} placeholders
+
+    Returns:
+        Function filling the template from keyword arguments with a single join
+    """
+    parts = [(literal, field) for literal, field, _, _ in string.Formatter().parse(template)]
+
+    def fill(**values: str) -> str:
+        pieces = []
+        for literal, field in parts:
+            pieces.append(literal)
+            if field is not None:
+                pieces.append(values[field])
+        return "".join(pieces)
+
+    return fill
+
+
+@functools.lru_cache(maxsize=256)
+def _format_sources(sources: Tuple[str, ...], total_chunks: int) -> str:
+    """
+    Format the sources section appended to RAG answers
+
+    Args:
+        sources: Sorted, de-duplicated source file names
+        total_chunks: Number of retrieved chunks
+
+    Returns:
+        Markdown sources section, or an empty string when there are no sources
+    """
+    if not sources:
+        return ""
+
+    sources_section = "\n\n---\n\n## 📚 Sources\n" + "\n".join(
+        f"📄 **{source}**" for source in sources
+    ) + "\n"
+
+    if total_chunks > 3:
+        sources_section += f"\n*Note: Showing top 3 of {total_chunks} relevant sections*"
+
+    return sources_section
+
+
+class MCPLLMAgent(MCPAgent):
+    """
+    LLM agent that uses MCP for communication
+
+    Handles response generation using Google Gemini
+    """
+
+    # Shared, read-only templates and their pre-split formatters
+    templates = MappingProxyType({
+        "rag_instructions": _RAG_INSTRUCTIONS,
+        "rag_prompt": _RAG_PROMPT,
+        "general_instructions": _GENERAL_INSTRUCTIONS,
+        "general_prompt": _GENERAL_PROMPT,
+        "batch_prompt": _BATCH_PROMPT,
+        "batch_request": _BATCH_REQUEST,
+        "error_response": _ERROR_RESPONSE,
+        "no_documents_response": _NO_DOCS_RESPONSE,
+    })
+    _formatters = MappingProxyType({
+        name: _compile_template(template) for name, template in templates.items()
+    })
+
+    def __init__(self, api_url: Optional[str] = None):
+        """
+        Initialize LLM agent
+
+        Args:
+            api_url: URL of MCP REST API (None for in-memory only)
+        """
+        super().__init__("LLMResponseAgent", api_url)
+
+        # Initialize Gemini
+        self.api_key = os.getenv("GEMINI_API_KEY")
+        if not self.api_key:
+            raise ValueError("GEMINI_API_KEY not found in environment variables")
+
+        genai.configure(api_key=self.api_key)
+
+        # Deterministic generation by default so identical prompts can be answered from cache
+        self.temperature = config.agent.temperature
+
+        # Exact-match response cache; sampled responses are never cached
+        self.response_cache = ResponseCache() if self.temperature == 0 else None
+
+        # Enhanced stats
+        self.stats.update(
+            {
+                "responses_generated": 0,
+                "rag_responses": 0,
+                "general_responses": 0,
+                "processing_errors": 0,
+                "total_tokens_used": 0,
+                "average_response_time": 0.0,
+                "cached_responses": 0,
+            }
+        )
+
+        # Bumped whenever the response stats change; consumers fetch the stats themselves
+        self._stats_version = 0
+
+        # The static instructions are sent as each model's system instruction, so
+        # every request shares the same prefix and only the dynamic tail varies
+        generation_config = {"temperature": self.temperature}
+        self.rag_model = genai.GenerativeModel(
+            "gemini-2.0-flash",
+            generation_config=generation_config,
+            system_instruction=self.templates["rag_instructions"],
+        )
+        self.general_model = genai.GenerativeModel(
+            "gemini-2.0-flash",
+            generation_config=generation_config,
+            system_instruction=self.templates["general_instructions"],
+        )
+
+        # Gemini calls run as coroutines on a dedicated event loop thread, so
+        # concurrent requests overlap instead of each blocking a thread
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever, name="LLMAgentEventLoop", daemon=True
+        )
+        self._loop_thread.start()
+        self._request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        # Circuit breaker state: consecutive Gemini failures and when the last one happened
+        self._consecutive_failures = 0
+        self.last_failure_time = 0.0
+
+        # Full tracebacks are only logged at DEBUG level, and at most one per second
+        self._traceback_limiter = RateLimiter(rate=1.0)
+
+        # Last Gemini API probe as (timestamp, status), refreshed off the request path
+        self._last_health: Optional[tuple] = None
+        self._health_timer: Optional[threading.Timer] = None
+        self._health_lock = threading.Lock()
+        self._closed = False
+
+        # Retrieval results wait here briefly so close arrivals share one request
+        self._pending_results = asyncio.Queue()
+        asyncio.run_coroutine_threadsafe(self._batch_worker(), self._loop)
 
         # Register message handlers
         self._register_handlers()
@@ -179,14 +349,162 @@ Upload your documents to get more tailored, document-specific answers with exact
     def _register_handlers(self):
         """Register message handlers"""
         self.mcp.register_handler(MessageType.RETRIEVAL_RESULT.value, self.handle_retrieval_result)
+        self.mcp.register_handler(MessageType.STATS_REQUEST.value, self.handle_stats_request)
+
+    def handle_stats_request(self, message):
+        """Reply to a stats request with the current generation stats"""
+        self.reply_to(
+            original_msg=message,
+            msg_type=MessageType.AGENT_STATUS.value,
+            payload={"agent_id": self.agent_id, "stats": self.get_stats()}
+        )
+
+    def close(self):
+        """Stop the health refresh timer, the batch worker and the event loop thread"""
+        with self._health_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._health_timer is not None:
+                self._health_timer.cancel()
+
+        self._run_async(self._cancel_tasks())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+
+    async def _cancel_tasks(self):
+        """Cancel the batch worker and any batches still in flight, and wait for them to finish"""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._loop.shutdown_asyncgens()
+
+    def _run_async(self, coro):
+        """Run a coroutine on the agent's event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
 
     def handle_retrieval_result(self, message):
         """
         Handle retrieval result messages
 
+        The message is queued on the agent's event loop, where results arriving
+        together are answered in one batched request; the reply is sent from
+        there, so the broker is not blocked for the Gemini round-trip.
+
         Args:
             message: MCP message with retrieval results
         """
+        self._loop.call_soon_threadsafe(self._pending_results.put_nowait, message)
+
+    async def _batch_worker(self):
+        """Collect retrieval results that arrive within the batch window and process them together"""
+        while True:
+            batch = [await self._pending_results.get()]
+            deadline = self._loop.time() + BATCH_WINDOW_SECONDS
+
+            while len(batch) < MAX_BATCH_SIZE:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._pending_results.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self._loop.create_task(self._process_batch(batch))
+
+    async def _process_batch(self, messages: List[Any]):
+        """Answer RAG results in one request; everything else goes through the single-call path"""
+        entries = []
+        singles = []
+
+        for message in messages:
+            chunks = message.payload.get("top_chunks", [])
+            query = message.payload.get("query", "")
+
+            if message.is_error() or not query or not chunks:
+                singles.append(message)
+                continue
+
+            prompt, sources, cache_key = self._build_rag_prompt(
+                chunks, self._chunk_file_names(message.payload), query
+            )
+            if cache_key is not None and self.response_cache.contains(cache_key):
+                singles.append(message)
+                continue
+
+            entries.append((message, prompt, sources, cache_key))
+
+        # A lone result is answered on its own, with streaming
+        if len(entries) < 2:
+            singles.extend(message for message, _, _, _ in entries)
+            entries = []
+
+        await asyncio.gather(
+            *(self._handle_retrieval_result(message) for message in singles),
+            *([self._handle_retrieval_batch(entries)] if entries else []),
+        )
+
+    async def _handle_retrieval_batch(self, entries: List[tuple]):
+        """Generate and send responses for several RAG results with one Gemini request"""
+        start_time = time.time()
+        logger.info(f"Generating {len(entries)} batched responses")
+
+        request_parts = [
+            self._formatters["batch_request"](number=str(number), request=prompt)
+            for number, (_, prompt, _, _) in enumerate(entries, 1)
+        ]
+        prompt = self._formatters["batch_prompt"](
+            count=str(len(entries)), requests="\n\n".join(request_parts)
+        )
+
+        try:
+            raw_text, response = await self._generate_text(self.rag_model, prompt)
+            self._record_token_usage(response)
+            answers = self._split_batch_answers(raw_text, len(entries))
+        except Exception as e:
+            # Answering individually would repeat the failing call once per request
+            error_msg = f"Error generating response: {str(e)}"
+            self._log_generation_error(error_msg, e)
+            for message, _, _, _ in entries:
+                self._reply_generation_error(message, error_msg)
+            return
+
+        retry = []
+        for (message, _, sources, cache_key), raw_answer in zip(entries, answers):
+            # Answers missing from the batched output fall back to a single call
+            if raw_answer is None:
+                retry.append(message)
+                continue
+
+            try:
+                chunks = message.payload.get("top_chunks", [])
+                response_data = self._finish_rag_response(raw_answer, chunks, sources, cache_key)
+                processing_time = time.time() - start_time
+                self._record_response("rag", processing_time)
+                self._send_generated_response(message, response_data, "rag", processing_time)
+
+            except Exception as e:
+                self._send_generation_error(message, e)
+
+        if retry:
+            await asyncio.gather(*(self._handle_retrieval_result(message) for message in retry))
+
+    @staticmethod
+    def _split_batch_answers(text: str, count: int) -> List[Optional[str]]:
+        """Split a batched response into per-request answers (None where one is missing)"""
+        parts = BATCH_ANSWER_DELIMITER.split(text)
+        answers = {}
+        for number, answer in zip(parts[1::2], parts[2::2]):
+            if answer.strip():
+                answers[int(number)] = answer.strip()
+
+        return [answers.get(number) for number in range(1, count + 1)]
+
+    async def _handle_retrieval_result(self, message):
+        """Generate and send the response for a retrieval result message"""
         try:
             if message.is_error():
                 logger.error(f"Received error from retrieval: {message.error}")
@@ -199,9 +517,8 @@ Upload your documents to get more tailored, document-specific answers with exact
 
             # Extract data from message
             chunks = message.payload.get("top_chunks", [])
-            chunk_metadata = message.payload.get("chunk_metadata", [])
+            file_names = self._chunk_file_names(message.payload)
             query = message.payload.get("query", "")
-            collection_size = message.payload.get("collection_size", 0)
 
             if not query:
                 error_msg = "No query provided in retrieval result"
@@ -215,151 +532,352 @@ Upload your documents to get more tailored, document-specific answers with exact
 
             logger.info(f"Generating response for query: {query[:50]}... with {len(chunks)} chunks")
 
-            start_time = time.time()
-
-            # Determine response mode
-            use_rag = chunks and len(chunks) > 0
-
-            if use_rag:
-                response_data = self._generate_rag_response(chunks, chunk_metadata, query)
-                response_type = "rag"
-                self.stats["rag_responses"] += 1
-            else:
-                response_data = self._generate_general_response_data(query)
-                response_type = "general"
-                self.stats["general_responses"] += 1
-
-            # Calculate processing time
-            processing_time = time.time() - start_time
-
-            # Update stats
-            self.stats["responses_generated"] += 1
-            self._update_average_response_time(processing_time)
-
-            logger.info(f"Generated {response_type} response in {processing_time:.2f}s")
-
-            # Send response back to coordinator
-            self.send_message(
-                receiver="CoordinatorAgent",
-                msg_type=MessageType.RESPONSE_GENERATED.value,
-                payload={
-                    **response_data,
-                    "query": query,
-                    "response_type": response_type,
-                    "collection_size": collection_size,
-                    "processing_time_seconds": processing_time,
-                    "generation_stats": self.stats.copy(),
-                },
-                metadata={
-                    "model_used": "gemini-2.0-flash",
-                    "response_length": len(response_data.get("answer", "")),
-                    "sources_used": len(chunks) if chunks else 0,
-                    "workflow_id": getattr(message, 'workflow_id', None),
-                    "parent_trace_id": message.trace_id
-                }
+            # Stream the raw model output to the coordinator as it is generated
+            workflow_id = self._workflow_id(message)
+            seq = itertools.count()
+
+            def send_delta(delta: str):
+                self.send_message(
+                    receiver="CoordinatorAgent",
+                    msg_type=MessageType.RESPONSE_CHUNK.value,
+                    payload={"query": query, "delta": delta, "seq": next(seq)},
+                    metadata={
+                        "workflow_id": workflow_id,
+                        "parent_trace_id": message.trace_id
+                    }
+                )
+
+            response_data, response_type, processing_time = await self._run_pipeline(
+                query, chunks, file_names, on_delta=send_delta
             )
 
+            if response_type == "error":
+                self._reply_generation_error(message, response_data["error"])
+                return
+
+            self._send_generated_response(message, response_data, response_type, processing_time)
+
         except Exception as e:
-            error_msg = f"Error generating response: {str(e)}"
-            logger.error(error_msg, exc_info=True)
-            self.stats["processing_errors"] += 1
+            self._send_generation_error(message, e)
 
-            self.reply_to(
-                original_msg=message,
-                msg_type=MessageType.ERROR.value,
-                payload={"error": error_msg}
-            )
+    async def _run_pipeline(
+        self,
+        query: str,
+        chunks: List[str],
+        file_names: List[str],
+        on_delta: Optional[Callable[[str], None]] = None,
+    ) -> Tuple[Dict[str, Any], str, float]:
+        """
+        Generate a response for a query, with RAG when there are context chunks
 
-    def _generate_rag_response(
-        self, chunks: List[str], metadata: List[Dict], query: str
-    ) -> Dict[str, Any]:
-        """Generate RAG response with context"""
-        try:
-            # Build context with source information
-            context_parts = []
-            sources = []
-
-            for i, (chunk, meta) in enumerate(
-                zip(chunks[:3], metadata[:3] if metadata else [])
-            ):
-                source_info = f"Document {i + 1}"
-                if meta:
-                    file_name = meta.get("file_name", "unknown")
-                    source_info = f"Document {i + 1} ({file_name})"
-                    sources.append(file_name)
-
-                context_parts.append(f"[{source_info}]\n{chunk}")
-
-            context = "\n\n".join(context_parts)
-            sources_text = ", ".join(set(sources)) if sources else "uploaded documents"
-
-            # Build prompt
-            prompt = self.templates["rag_prompt"].format(
-                context=context, sources=sources_text, query=query
+        Args:
+            query: Query string
+            chunks: Retrieved context chunks
+            file_names: Source file name of each chunk
+            on_delta: Callback receiving raw model output as it streams
+
+        Returns:
+            Tuple of the response data, the response type ("rag", "general", or "error"
+            when generation failed) and the processing time
+        """
+        start_time = time.time()
+
+        if chunks:
+            response_data = await self._generate_rag_response(
+                chunks, file_names, query, on_delta=on_delta
             )
+            response_type = "rag"
+        else:
+            response_data = await self._generate_general_response_data(query, on_delta=on_delta)
+            response_type = "general"
 
-            # Generate response
-            response = self.model.generate_content(prompt)
-            raw_answer = response.text
+        processing_time = time.time() - start_time
 
-            # Enhance formatting
-            enhanced_answer = self._enhance_response_formatting(raw_answer, "rag")
+        # Failed generations carry the error and are not counted as responses
+        if "error" in response_data:
+            return response_data, "error", processing_time
 
-            # Add formatted sources section
-            sources_section = self._format_sources_section(sources, len(chunks))
-            final_answer = enhanced_answer + sources_section
+        self._record_response(response_type, processing_time)
 
-            # Update token stats if available
-            if hasattr(response, "usage_metadata"):
-                self.stats["total_tokens_used"] += getattr(
-                    response.usage_metadata, "total_token_count", 0
-                )
+        return response_data, response_type, processing_time
 
-            return {
-                "answer": final_answer,
-                "context_chunks": chunks[:3],
-                "sources_used": len(chunks),
+    def _record_response(self, response_type: str, processing_time: float):
+        """Update counters and average response time for a generated response"""
+        self.stats[f"{response_type}_responses"] += 1
+        self.stats["responses_generated"] += 1
+        self._update_average_response_time(processing_time)
+        self._stats_version += 1
+
+    def _record_error(self):
+        """Count a response that could not be generated"""
+        self.stats["processing_errors"] += 1
+        self._stats_version += 1
+
+    def _send_generated_response(
+        self, message, response_data: Dict[str, Any], response_type: str, processing_time: float
+    ):
+        """Send a generated response back to the coordinator"""
+        query = message.payload.get("query", "")
+        chunks = message.payload.get("top_chunks", [])
+
+        logger.info(f"Generated {response_type} response in {processing_time:.2f}s")
+
+        # Send response back to coordinator
+        self.send_message(
+            receiver="CoordinatorAgent",
+            msg_type=MessageType.RESPONSE_GENERATED.value,
+            payload={
+                **response_data,
+                "query": query,
+                "response_type": response_type,
+                "collection_size": message.payload.get("collection_size", 0),
+                "processing_time_seconds": processing_time,
+                "stats_version": self._stats_version,
+            },
+            metadata={
+                "model_used": "gemini-2.0-flash",
+                "response_length": len(response_data.get("answer", "")),
+                "sources_used": len(chunks) if chunks else 0,
+                "workflow_id": self._workflow_id(message),
+                "parent_trace_id": message.trace_id
+            }
+        )
+
+    @staticmethod
+    def _workflow_id(message) -> Optional[str]:
+        """Workflow a retrieval result belongs to, carried in its metadata by the retrieval agent"""
+        return message.workflow_id or message.metadata.get("workflow_id")
+
+    def _log_generation_error(self, error_msg: str, error: Exception):
+        """Log a generation error, with a rate-limited traceback when DEBUG is enabled"""
+        if logger.isEnabledFor(logging.DEBUG) and self._traceback_limiter.allow():
+            logger.error(error_msg, exc_info=error)
+        else:
+            logger.error("%s (type=%s)", error_msg, type(error).__name__)
+
+    def _send_generation_error(self, message, error: Exception):
+        """Log an error raised while answering a retrieval result and reply with it"""
+        error_msg = f"Error generating response: {str(error)}"
+        self._log_generation_error(error_msg, error)
+        self._reply_generation_error(message, error_msg)
+
+    def _reply_generation_error(self, message, error_msg: str):
+        """Report a retrieval result whose response could not be generated to its workflow"""
+        self._record_error()
+
+        self.send_message(
+            receiver="CoordinatorAgent",
+            msg_type=MessageType.ERROR.value,
+            payload={"error": error_msg, "query": message.payload.get("query", "")},
+            metadata={
+                "workflow_id": self._workflow_id(message),
+                "parent_trace_id": message.trace_id
             }
+        )
+
+    async def _generate_text(
+        self, model, prompt: str, on_delta: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Generate text for a prompt, streaming it to on_delta when given
+
+        Args:
+            model: Gemini model to generate with
+            prompt: Prompt text
+            on_delta: Called with each piece of text as it arrives
+
+        Returns:
+            Tuple of the full text and the response (for usage metadata)
+
+        Raises:
+            CircuitOpenError: If recent calls kept failing and the recovery timeout has not passed
+        """
+        if self._consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            remaining = CIRCUIT_RECOVERY_SECONDS - (time.monotonic() - self.last_failure_time)
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"Gemini API unavailable after {self._consecutive_failures} consecutive failures, "
+                    f"retrying in {remaining:.0f}s"
+                )
+
+        try:
+            async with self._request_semaphore:
+                if on_delta is None:
+                    response = await model.generate_content_async(prompt)
+                    text = response.text
+                else:
+                    response = await model.generate_content_async(prompt, stream=True)
+                    buffer = io.StringIO()
+                    async for chunk in response:
+                        buffer.write(chunk.text)
+                        on_delta(chunk.text)
+                    text = buffer.getvalue()
+
+        except API_FAILURES:
+            self._consecutive_failures += 1
+            self.last_failure_time = time.monotonic()
+            raise
+
+        self._consecutive_failures = 0
+        return text, response
+
+    def _record_token_usage(self, response):
+        """Update token stats from a Gemini response if usage metadata is available"""
+        try:
+            self.stats["total_tokens_used"] += response.usage_metadata.total_token_count
+        except AttributeError:
+            pass
+
+    @staticmethod
+    def _chunk_file_names(payload: Dict[str, Any]) -> List[str]:
+        """Source file names of a retrieval result, derived from chunk_metadata for older senders"""
+        if "chunk_file_names" in payload:
+            return payload["chunk_file_names"]
+
+        return [
+            meta.get("file_name", "unknown")
+            for meta in payload.get("chunk_metadata", [])
+        ]
+
+    def _build_rag_prompt(
+        self, chunks: List[str], file_names: List[str], query: str
+    ) -> tuple:
+        """
+        Build the RAG prompt for a query and its context
+
+        Returns:
+            Tuple of the prompt, the sorted unique source file names and the
+            response cache key (None when caching is disabled)
+        """
+        # Chunks without a matching file name are labelled "unknown" rather than dropped
+        top_file_names = [
+            file_name
+            for _, file_name in zip(chunks[:3], itertools.chain(file_names, itertools.repeat("unknown")))
+        ]
+
+        # Build context with source information
+        context = "\n\n".join(
+            f"[Document {i + 1} ({file_name})]\n{chunk[:MAX_CHARS_PER_CHUNK]}"
+            for i, (chunk, file_name) in enumerate(zip(chunks[:3], top_file_names))
+        )
+
+        # Sorted so the same documents always produce the same prompt and sources section
+        sources = tuple(sorted(set(top_file_names)))
+        sources_text = ", ".join(sources) if sources else "uploaded documents"
+
+        # Build prompt
+        prompt = self._formatters["rag_prompt"](
+            context=context, sources=sources_text, query=query
+        )
+
+        # Keyed on the exact prompt, so any change to the sent context is a miss; the
+        # chunk count is included because the sources section mentions it
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = ResponseCache.make_key("rag", str(len(chunks)), prompt)
+
+        return prompt, sources, cache_key
+
+    def _finish_rag_response(
+        self, raw_answer: str, chunks: List[str], sources: Tuple[str, ...], cache_key: Optional[str]
+    ) -> Dict[str, Any]:
+        """Format a raw RAG answer, add its sources and cache the result"""
+        # Enhance formatting
+        enhanced_answer = self._enhance_response_formatting(raw_answer, "rag")
+
+        # Add formatted sources section
+        sources_section = _format_sources(sources, len(chunks))
+        final_answer = enhanced_answer + sources_section
+
+        result = {
+            "answer": final_answer,
+            "context_chunks": chunks[:3],
+            "sources_used": len(chunks),
+        }
+
+        if cache_key is not None:
+            self.response_cache.set(cache_key, result)
+
+        return result
+
+    async def _generate_rag_response(
+        self,
+        chunks: List[str],
+        file_names: List[str],
+        query: str,
+        on_delta: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
+        """Generate RAG response with context, streaming raw output to on_delta if given"""
+        try:
+            prompt, sources, cache_key = self._build_rag_prompt(chunks, file_names, query)
+
+            if cache_key is not None:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    self.stats["cached_responses"] += 1
+                    return {**cached, "sources_used": len(chunks)}
+
+            # Generate response
+            raw_answer, response = await self._generate_text(self.rag_model, prompt, on_delta)
+            self._record_token_usage(response)
+
+            return self._finish_rag_response(raw_answer, chunks, sources, cache_key)
 
         except Exception as e:
+            # A general-knowledge retry would hit the same failing API, so answer with the error
             logger.error(f"Error in RAG response generation: {str(e)}")
-            # Fallback to general response
-            return self._generate_general_response_data(query)
+            return self._error_response_data(e)
 
-    def _generate_general_response_data(self, query: str) -> Dict[str, Any]:
-        """Generate general response without context"""
+    async def _generate_general_response_data(
+        self, query: str, on_delta: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """Generate general response without context, streaming raw output to on_delta if given"""
         try:
-            prompt = self.templates["general_prompt"].format(query=query)
+            cache_key = None
+            if self.response_cache is not None:
+                cache_key = ResponseCache.make_key("general", query)
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    self.stats["cached_responses"] += 1
+                    return cached
+
+            prompt = self._formatters["general_prompt"](query=query)
 
             # Generate response
-            response = self.model.generate_content(prompt)
-            raw_answer = response.text
+            raw_answer, response = await self._generate_text(self.general_model, prompt, on_delta)
 
             # Enhance formatting
             enhanced_answer = self._enhance_response_formatting(raw_answer, "general")
             
             # Format with no documents template to clearly indicate this is from general knowledge
-            final_answer = self.templates["no_documents_response"].format(answer=enhanced_answer)
+            final_answer = self._formatters["no_documents_response"](answer=enhanced_answer)
 
             # Update token stats if available
-            if hasattr(response, "usage_metadata"):
-                self.stats["total_tokens_used"] += getattr(
-                    response.usage_metadata, "total_token_count", 0
-                )
+            self._record_token_usage(response)
 
-            return {
+            result = {
                 "answer": final_answer,
                 "context_chunks": [],
                 "sources_used": 0,
             }
 
+            if cache_key is not None:
+                self.response_cache.set(cache_key, result)
+
+            return result
+
         except Exception as e:
             logger.error(f"Error in general response generation: {str(e)}")
-            return {
-                "answer": self.templates["error_response"].format(error=str(e)),
-                "context_chunks": [],
-                "sources_used": 0,
-            }
+            return self._error_response_data(e)
+
+    def _error_response_data(self, error: Exception) -> Dict[str, Any]:
+        """Response data for a failed generation; the "error" key marks it as failed"""
+        return {
+            "answer": self._formatters["error_response"](error=str(error)),
+            "context_chunks": [],
+            "sources_used": 0,
+            "error": f"Error generating response: {str(error)}",
+        }
 
     def _enhance_response_formatting(self, text: str, response_type: str) -> str:
         """Enhance response formatting with better structure"""
@@ -367,68 +885,24 @@ Upload your documents to get more tailored, document-specific answers with exact
         # Just ensure proper line breaks and formatting
         enhanced = text.strip()
         
-        # Ensure proper spacing around headers
-        enhanced = enhanced.replace("##", "\n##")
-        enhanced = enhanced.replace("\n\n##", "\n##")
-        
-        # Clean up extra whitespace
-        lines = enhanced.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            cleaned_lines.append(line.rstrip())
-        
-        return '\n'.join(cleaned_lines)
-
-    def _format_sources_section(self, sources: List[str], total_chunks: int) -> str:
-        """Format sources section"""
-        if not sources:
-            return ""
-
-        sources_section = "\n\n---\n\n## 📚 Sources\n"
-        unique_sources = list(set(sources))
-        
-        for source in unique_sources:
-            sources_section += f"📄 **{source}**\n"
-        
-        if total_chunks > 3:
-            sources_section += f"\n*Note: Showing top 3 of {total_chunks} relevant sections*"
+        # Ensure every header starts on a new line
+        enhanced = HEADER_MARKER.sub("\n##", enhanced)
         
-        return sources_section
-
-    def _send_general_response(self, original_message, query: str):
-        """Send a general response when no context is available"""
-        response_data = self._generate_general_response_data(query)
-
-        self.send_message(
-            receiver="CoordinatorAgent",
-            msg_type=MessageType.RESPONSE_GENERATED.value,
-            payload={
-                **response_data,
-                "query": query,
-                "response_type": "general",
-                "collection_size": 0,
-                "processing_time_seconds": 0.0,
-            },
-            metadata={
-                "workflow_id": getattr(original_message, 'workflow_id', None),
-                "parent_trace_id": original_message.trace_id
-            }
-        )
-
-        self.stats["general_responses"] += 1
-        self.stats["responses_generated"] += 1
+        # Clean up trailing whitespace on every line
+        return TRAILING_WHITESPACE.sub("", enhanced)
 
     def _update_average_response_time(self, processing_time: float):
-        """Update average response time"""
-        if self.stats["responses_generated"] > 0:
-            total_time = self.stats["average_response_time"] * (self.stats["responses_generated"] - 1)
-            self.stats["average_response_time"] = (total_time + processing_time) / self.stats["responses_generated"]
+        """Update average response time incrementally (responses_generated must already count this response)"""
+        self.stats["average_response_time"] += (
+            processing_time - self.stats["average_response_time"]
+        ) / self.stats["responses_generated"]
 
     def generate_response(
         self,
         query: str,
         context_chunks: List[str] = None,
         chunk_metadata: List[Dict] = None,
+        chunk_file_names: List[str] = None,
     ) -> Dict[str, Any]:
         """
         Generate response (direct method for backward compatibility)
@@ -436,37 +910,28 @@ Upload your documents to get more tailored, document-specific answers with exact
         Args:
             query: Query string
             context_chunks: Retrieved context chunks
-            chunk_metadata: Metadata for chunks
+            chunk_metadata: Metadata for chunks (used when chunk_file_names is not given)
+            chunk_file_names: Source file name of each chunk
 
         Returns:
             Generated response
         """
-        start_time = time.time()
-
         try:
             if not query.strip():
                 return {"status": "error", "error": "Empty query provided"}
 
-            # Determine response mode
-            use_rag = context_chunks and len(context_chunks) > 0
-
-            if use_rag:
-                response_data = self._generate_rag_response(
-                    context_chunks, chunk_metadata or [], query
+            if chunk_file_names is None:
+                chunk_file_names = self._chunk_file_names(
+                    {"chunk_metadata": chunk_metadata or []}
                 )
-                response_type = "rag"
-                self.stats["rag_responses"] += 1
-            else:
-                response_data = self._generate_general_response_data(query)
-                response_type = "general"
-                self.stats["general_responses"] += 1
 
-            # Calculate processing time
-            processing_time = time.time() - start_time
+            response_data, response_type, processing_time = self._run_async(
+                self._run_pipeline(query, context_chunks or [], chunk_file_names)
+            )
 
-            # Update stats
-            self.stats["responses_generated"] += 1
-            self._update_average_response_time(processing_time)
+            if response_type == "error":
+                self._record_error()
+                return {"status": "error", "error": response_data["error"]}
 
             return {
                 "status": "success",
@@ -478,20 +943,64 @@ Upload your documents to get more tailored, document-specific answers with exact
 
         except Exception as e:
             error_msg = f"Error generating response: {str(e)}"
-            logger.error(error_msg, exc_info=True)
-            self.stats["processing_errors"] += 1
+            self._log_generation_error(error_msg, e)
+            self._record_error()
 
             return {"status": "error", "error": error_msg}
 
-    def health_check(self) -> Dict[str, Any]:
-        """Get agent health status"""
+    def get_stats(self) -> Dict[str, Any]:
+        """Get agent statistics, including the stats version and the response cache"""
+        stats = super().get_stats()
+        stats["stats_version"] = self._stats_version
+        if self.response_cache is not None:
+            stats["response_cache"] = self.response_cache.get_stats()
+        return stats
+
+    def _probe_api(self) -> str:
+        """Check Gemini API reachability with an unbilled model listing request"""
         try:
-            # Test Gemini API connection
-            test_response = self.model.generate_content("Test connection")
-            api_status = "healthy" if test_response else "degraded"
-        except Exception as e:
+            response = requests.get(
+                GEMINI_MODELS_URL,
+                params={"pageSize": 1},
+                headers={"x-goog-api-key": self.api_key},
+                timeout=1.0,
+            )
+            return "healthy" if response.status_code == 200 else "degraded"
+        except requests.exceptions.RequestException as e:
             logger.warning(f"Gemini API health check failed: {str(e)}")
-            api_status = "degraded"
+            return "degraded"
+
+    def _refresh_api_status(self) -> str:
+        """Probe the Gemini API and cache the result"""
+        api_status = self._probe_api()
+        self._last_health = (time.time(), api_status)
+        return api_status
+
+    def _schedule_health_refresh(self):
+        """Re-probe the Gemini API every HEALTH_REFRESH_SECONDS in the background"""
+        def refresh():
+            self._refresh_api_status()
+            with self._health_lock:
+                if not self._closed:
+                    self._schedule_health_refresh()
+
+        self._health_timer = threading.Timer(HEALTH_REFRESH_SECONDS, refresh)
+        self._health_timer.daemon = True
+        self._health_timer.start()
+
+    def health_check(self) -> Dict[str, Any]:
+        """Get agent health status from the cached Gemini API probe"""
+        last_health = self._last_health
+        if last_health is None or time.time() - last_health[0] >= HEALTH_CACHE_SECONDS:
+            api_status = self._refresh_api_status()
+        else:
+            api_status = last_health[1]
+
+        # Keep the cached status fresh once health is being monitored; the lock keeps
+        # concurrent first calls from starting more than one refresh chain
+        with self._health_lock:
+            if self._health_timer is None and not self._closed:
+                self._schedule_health_refresh()
 
         return {
             "status": "healthy" if api_status == "healthy" else "degraded",
@@ -156,6 +156,8 @@ class MCPRetrievalAgent(MCPAgent):
                 relevant_chunks = [result["document"] for result in search_results]
                 metadata_list = [result["metadata"] for result in search_results]
             
+            file_names = [meta.get("file_name", "unknown") for meta in metadata_list]
+            
             # Update stats
             self.stats["queries_processed"] += 1
             
@@ -168,6 +170,7 @@ class MCPRetrievalAgent(MCPAgent):
                 payload={
                     "top_chunks": relevant_chunks,
                     "chunk_metadata": metadata_list,
+                    "chunk_file_names": file_names,
                     "query": query,
                     "total_results": len(relevant_chunks),
                     "collection_size": self.vector_store.get_collection_info()["count"],
@@ -176,7 +179,9 @@ class MCPRetrievalAgent(MCPAgent):
                 metadata={
                     "search_k": k,
                     "similarity_threshold": similarity_threshold,
-                    "query_length": len(query)
+                    "query_length": len(query),
+                    # The coordinator sends QUERY_REQUEST with the workflow id as its trace id
+                    "workflow_id": message.trace_id
                 }
             )
             
@@ -226,7 +231,8 @@ class MCPRetrievalAgent(MCPAgent):
                 "error": error_msg
             }
     
-    def retrieve_context(self, query: str, k: int = 5, similarity_threshold: float = 0.7) -> Dict[str, Any]:
+    def retrieve_context(self, query: str, k: int = 5, similarity_threshold: float = 0.7,
+                         query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
         """
         Retrieve context for a query
         
@@ -234,6 +240,7 @@ class MCPRetrievalAgent(MCPAgent):
             query: Query string
             k: Number of results to return
             similarity_threshold: Minimum similarity score
+            query_embedding: Embedding of the query from embed_query(), if already computed
             
         Returns:
             Retrieved context and metadata
@@ -244,11 +251,14 @@ class MCPRetrievalAgent(MCPAgent):
                     "status": "error",
                     "error": "Empty query provided",
                     "top_chunks": [],
-                    "chunk_metadata": []
+                    "chunk_metadata": [],
+                    "chunk_file_names": []
                 }
             
             # Enhanced search with metadata
-            search_results = self.vector_store.search_with_metadata(query, k=k)
+            search_results = self.vector_store.search_with_metadata(
+                query, k=k, query_embedding=query_embedding
+            )
             
             if not search_results:
                 logger.info(f"No relevant documents found for query: {query}")
@@ -258,6 +268,8 @@ class MCPRetrievalAgent(MCPAgent):
                 relevant_chunks = [result["document"] for result in search_results]
                 metadata_list = [result["metadata"] for result in search_results]
             
+            file_names = [meta.get("file_name", "unknown") for meta in metadata_list]
+            
             # Update stats
             self.stats["queries_processed"] += 1
             
@@ -267,6 +279,7 @@ class MCPRetrievalAgent(MCPAgent):
                 "status": "success",
                 "top_chunks": relevant_chunks,
                 "chunk_metadata": metadata_list,
+                "chunk_file_names": file_names,
                 "query": query,
                 "total_results": len(relevant_chunks),
                 "collection_size": self.vector_store.get_collection_info()["count"]
@@ -281,9 +294,88 @@ class MCPRetrievalAgent(MCPAgent):
                 "status": "error",
                 "error": error_msg,
                 "top_chunks": [],
-                "chunk_metadata": []
+                "chunk_metadata": [],
+                "chunk_file_names": []
             }
     
+    def retrieve_contexts_batch(self, queries: List[str], k: int = 5, similarity_threshold: float = 0.7) -> List[Dict[str, Any]]:
+        """
+        Retrieve context for several queries, embedding them in a single batch
+        
+        Args:
+            queries: Query strings
+            k: Number of results to return per query
+            similarity_threshold: Minimum similarity score
+            
+        Returns:
+            Retrieved context and metadata for each query, in input order
+        """
+        results: List[Dict[str, Any]] = [
+            {
+                "status": "error",
+                "error": "Empty query provided",
+                "top_chunks": [],
+                "chunk_metadata": [],
+                "chunk_file_names": []
+            }
+            for _ in queries
+        ]
+        
+        valid_idx = [i for i, query in enumerate(queries) if query.strip()]
+        if not valid_idx:
+            return results
+        
+        try:
+            valid_queries = [queries[i] for i in valid_idx]
+            # Embed the batch here so each result can hand its embedding on to answer()
+            query_embeddings = self.vector_store.embed(valid_queries)
+            batch_results = self.vector_store.search_batch_with_metadata(
+                valid_queries, k=k, query_embeddings=query_embeddings
+            )
+            collection_size = self.vector_store.get_collection_info()["count"]
+            
+            for i, query, query_embedding, search_results in zip(
+                valid_idx, valid_queries, query_embeddings, batch_results
+            ):
+                relevant_chunks = [result["document"] for result in search_results]
+                metadata_list = [result["metadata"] for result in search_results]
+                
+                results[i] = {
+                    "status": "success",
+                    "top_chunks": relevant_chunks,
+                    "chunk_metadata": metadata_list,
+                    "chunk_file_names": [meta.get("file_name", "unknown") for meta in metadata_list],
+                    "query": query,
+                    "query_embedding": query_embedding,
+                    "total_results": len(relevant_chunks),
+                    "collection_size": collection_size
+                }
+            
+            # Update stats
+            self.stats["queries_processed"] += len(valid_idx)
+            
+            logger.info(f"Retrieved context for a batch of {len(valid_idx)} queries")
+            
+        except Exception as e:
+            error_msg = f"Error retrieving context for query batch: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            self.stats["errors"] += 1
+            
+            for i in valid_idx:
+                results[i] = {
+                    "status": "error",
+                    "error": error_msg,
+                    "top_chunks": [],
+                    "chunk_metadata": [],
+                    "chunk_file_names": []
+                }
+        
+        return results
+    
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query with the same model used for retrieval"""
+        return self.vector_store.embed([query])[0]
+    
     def get_collection_info(self) -> Dict[str, Any]:
         """Get vector store collection information"""
         return self.vector_store.get_collection_info()
@@ -299,6 +391,21 @@ class MCPRetrievalAgent(MCPAgent):
         except Exception as e:
             error_msg = f"Error clearing collection: {str(e)}"
             logger.error(error_msg, exc_info=True)
+            return {
+                "status": "error",
+                "error": error_msg
+            }
+    
+    def clear_embedding_cache(self) -> Dict[str, Any]:
+        """Clear cached document and query embeddings"""
+        try:
+            self.vector_store.clear_embedding_cache()
+            return {
+                "status": "success"
+            }
+        except Exception as e:
+            error_msg = f"Error clearing embedding cache: {str(e)}"
+            logger.error(error_msg, exc_info=True)
             return {
                 "status": "error",
                 "error": error_msg
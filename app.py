@@ -13,7 +13,10 @@ from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
 import os
 import logging
+import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 from datetime import datetime
 from agents.mcp_coordinator import MCPCoordinatorAgent
@@ -52,6 +55,12 @@ except Exception as e:
 # Allowed file extensions
 ALLOWED_EXTENSIONS = config.system.allowed_extensions
 
+# Read size used when streaming raw request bodies to disk
+UPLOAD_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Maximum number of files ingested concurrently by /upload/batch
+BATCH_UPLOAD_MAX_WORKERS = 8
+
 
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -117,6 +126,23 @@ def health_check():
         ), 503
 
 
+@app.route("/status", methods=["GET"])
+def status():
+    """Lightweight status endpoint reporting the indexed collection size"""
+    if not coordinator:
+        return jsonify({"error": "System not initialized"}), 503
+
+    collection_info = coordinator.retrieval_agent.get_collection_info()
+
+    return jsonify(
+        {
+            "collection_size": collection_info.get("count", 0),
+            "active_workflows": len(coordinator.get_active_workflows()),
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
+
+
 @app.route("/stats", methods=["GET"])
 def get_stats():
     """System statistics endpoint with MCP metrics"""
@@ -151,83 +177,146 @@ def get_stats():
         return jsonify({"error": "Failed to get statistics"}), 500
 
 
-@app.route("/upload", methods=["POST"])
-def upload_files():
-    """File upload with MCP workflow tracking"""
-    if not coordinator:
-        return jsonify({"error": "System not initialized"}), 503
+def _start_ingestion(filename, filepath):
+    """Send an ingestion request for a saved upload through MCP"""
+    start_time = time.time()
+    ingestion_msg = coordinator.send_message(
+        receiver=coordinator.agent_id,
+        msg_type=MessageType.INGESTION_REQUEST.value,
+        payload={
+            "file_path": filepath,
+            "chunk_size": config.agent.chunk_size,
+            "chunk_overlap": config.agent.chunk_overlap,
+        },
+    )
 
-    if "files" not in request.files:
-        return jsonify({"error": "No files provided"}), 400
+    processing_time = time.time() - start_time
 
-    files = request.files.getlist("files")
-    if not files or all(f.filename == "" for f in files):
-        return jsonify({"error": "No files selected"}), 400
+    return {
+        "filename": filename,
+        "status": "processing_started",
+        "processing_time": round(processing_time, 2),
+        "trace_id": ingestion_msg.trace_id,
+    }
 
-    results = {"uploaded_files": [], "failed_files": [], "processing_results": []}
 
-    for file in files:
-        if not file or file.filename == "":
-            continue
+def _discard_upload(filepath):
+    """Remove a rejected or partially written upload, if it was created"""
+    try:
+        os.remove(filepath)
+    except FileNotFoundError:
+        pass
 
-        filename = secure_filename(file.filename)
-        if not filename:
-            results["failed_files"].append(
-                {"filename": file.filename, "error": "Invalid filename"}
-            )
-            continue
 
-        if not allowed_file(filename):
-            results["failed_files"].append(
-                {
-                    "filename": filename,
-                    "error": f"Unsupported file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}",
-                }
-            )
-            continue
-
-        try:
-            # Save file
-            filepath = os.path.join(config.system.upload_folder, filename)
-            file.save(filepath)
-
-            # Validate file can be parsed
-            if not DocumentParser.is_supported_file(filepath):
-                results["failed_files"].append(
-                    {"filename": filename, "error": "File type not supported by parser"}
-                )
-                os.remove(filepath)  # Clean up
-                continue
-
-            # Send ingestion request through MCP
-            start_time = time.time()
-            ingestion_msg = coordinator.send_message(
-                receiver=coordinator.agent_id,
-                msg_type=MessageType.INGESTION_REQUEST.value,
-                payload={
-                    "file_path": filepath,
-                    "chunk_size": config.agent.chunk_size,
-                    "chunk_overlap": config.agent.chunk_overlap,
-                },
-            )
+def _upload_csv_stream():
+    """Save a raw text/csv request body named by the ?filename= parameter"""
+    filename = secure_filename(request.args.get("filename", ""))
+    if not filename:
+        return jsonify({"error": "No filename provided"}), 400
 
-            processing_time = time.time() - start_time
+    if not filename.lower().endswith(".csv"):
+        return jsonify({"error": "Raw uploads must be CSV files"}), 400
 
-            results["uploaded_files"].append(filename)
-            results["processing_results"].append(
-                {
-                    "filename": filename,
-                    "status": "processing_started",
-                    "processing_time": round(processing_time, 2),
-                    "trace_id": ingestion_msg.trace_id,
-                }
-            )
+    filepath = os.path.join(config.system.upload_folder, filename)
+
+    try:
+        # Copy the body in fixed-size reads so memory use doesn't grow with the file
+        with open(filepath, "wb") as f:
+            shutil.copyfileobj(request.stream, f, UPLOAD_STREAM_CHUNK_SIZE)
+
+        # Validate file can be parsed
+        if not DocumentParser.is_supported_file(filepath):
+            _discard_upload(filepath)
+            return jsonify({"error": "File type not supported by parser"}), 400
+
+        processing_result = _start_ingestion(filename, filepath)
+
+    except RequestEntityTooLarge:
+        _discard_upload(filepath)
+        raise
+    except Exception as e:
+        # Includes client disconnects mid-body, which leave a partial file behind
+        logger.error(f"Error processing file {filename}: {str(e)}")
+        _discard_upload(filepath)
+        return jsonify({"error": f"Processing error: {str(e)}"}), 500
+
+    return jsonify(
+        {
+            "uploaded_files": [filename],
+            "failed_files": [],
+            "processing_results": [processing_result],
+            "message": "Started processing 1 files",
+        }
+    )
+
+
+def _save_upload(file, results):
+    """
+    Validate and save one uploaded file, recording rejections in results
+
+    Returns:
+        (filename, filepath) of the saved file, or None if it was rejected
+    """
+    if not file or file.filename == "":
+        return None
+
+    filename = secure_filename(file.filename)
+    if not filename:
+        results["failed_files"].append(
+            {"filename": file.filename, "error": "Invalid filename"}
+        )
+        return None
+
+    if not allowed_file(filename):
+        results["failed_files"].append(
+            {
+                "filename": filename,
+                "error": f"Unsupported file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}",
+            }
+        )
+        return None
+
+    try:
+        # Save file
+        filepath = os.path.join(config.system.upload_folder, filename)
+        file.save(filepath)
 
-        except Exception as e:
-            logger.error(f"Error processing file {filename}: {str(e)}")
+        # Validate file can be parsed
+        if not DocumentParser.is_supported_file(filepath):
             results["failed_files"].append(
-                {"filename": filename, "error": f"Processing error: {str(e)}"}
+                {"filename": filename, "error": "File type not supported by parser"}
             )
+            os.remove(filepath)  # Clean up
+            return None
+
+        return filename, filepath
+
+    except Exception as e:
+        logger.error(f"Error processing file {filename}: {str(e)}")
+        results["failed_files"].append(
+            {"filename": filename, "error": f"Processing error: {str(e)}"}
+        )
+        return None
+
+
+def _ingest_upload(saved):
+    """Start ingestion of a saved upload, returning (succeeded, result entry)"""
+    filename, filepath = saved
+    try:
+        return True, _start_ingestion(filename, filepath)
+    except Exception as e:
+        logger.error(f"Error processing file {filename}: {str(e)}")
+        return False, {"filename": filename, "error": f"Processing error: {str(e)}"}
+
+
+def _upload_response(results, outcomes):
+    """Record ingestion outcomes in results and build the upload response"""
+    for succeeded, entry in outcomes:
+        if succeeded:
+            results["uploaded_files"].append(entry["filename"])
+            results["processing_results"].append(entry)
+        else:
+            results["failed_files"].append(entry)
 
     # Prepare response
     success_count = len(results["uploaded_files"])
@@ -250,6 +339,56 @@ def upload_files():
         )
 
 
+@app.route("/upload", methods=["POST"])
+def upload_files():
+    """File upload with MCP workflow tracking"""
+    if not coordinator:
+        return jsonify({"error": "System not initialized"}), 503
+
+    # Raw CSV bodies (e.g. chunked uploads) are streamed to disk as they arrive
+    if request.mimetype == "text/csv":
+        return _upload_csv_stream()
+
+    if "files" not in request.files:
+        return jsonify({"error": "No files provided"}), 400
+
+    files = request.files.getlist("files")
+    if not files or all(f.filename == "" for f in files):
+        return jsonify({"error": "No files selected"}), 400
+
+    results = {"uploaded_files": [], "failed_files": [], "processing_results": []}
+
+    saved_files = [saved for saved in (_save_upload(file, results) for file in files) if saved]
+
+    return _upload_response(results, [_ingest_upload(saved) for saved in saved_files])
+
+
+@app.route("/upload/batch", methods=["POST"])
+def upload_files_batch():
+    """File upload that ingests all files of the request in parallel"""
+    if not coordinator:
+        return jsonify({"error": "System not initialized"}), 503
+
+    if "files" not in request.files:
+        return jsonify({"error": "No files provided"}), 400
+
+    files = request.files.getlist("files")
+    if not files or all(f.filename == "" for f in files):
+        return jsonify({"error": "No files selected"}), 400
+
+    results = {"uploaded_files": [], "failed_files": [], "processing_results": []}
+
+    saved_files = [saved for saved in (_save_upload(file, results) for file in files) if saved]
+
+    outcomes = []
+    if saved_files:
+        # Parsing and embedding release the GIL, so files ingest concurrently
+        with ThreadPoolExecutor(max_workers=min(BATCH_UPLOAD_MAX_WORKERS, len(saved_files))) as executor:
+            outcomes = list(executor.map(_ingest_upload, saved_files))
+
+    return _upload_response(results, outcomes)
+
+
 @app.route("/query", methods=["POST"])
 def query():
     """Query processing with MCP workflow tracking"""
@@ -286,28 +425,26 @@ def query():
         # For now, fall back to direct method calls since the workflow is async
         # In a production system, you'd want to implement proper async handling
         
-        # Step 1: Get context from retrieval agent
-        retrieval_result = coordinator.retrieval_agent.retrieve_context(
-            query=query_text,
+        # Retrieve context and generate the answer; repeated and near-duplicate
+        # queries are served from the coordinator's semantic cache
+        llm_result = coordinator.answer(
+            query_text,
             k=search_k,
             similarity_threshold=config.agent.similarity_threshold,
         )
+        collection_size = llm_result.get("collection_size", 0)
 
-        if retrieval_result.get("status") == "error":
-            logger.error(f"Retrieval failed: {retrieval_result.get('error')}")
-            # Continue with empty context for general response
-            context_chunks = []
-            chunk_metadata = []
-        else:
-            context_chunks = retrieval_result.get("top_chunks", [])
-            chunk_metadata = retrieval_result.get("chunk_metadata", [])
-
-        # Step 2: Generate response using LLM agent
-        llm_result = coordinator.llm_agent.generate_response(
-            query=query_text,
-            context_chunks=context_chunks,
-            chunk_metadata=chunk_metadata,
+        # Without context, answer from general knowledge; a failed generation is
+        # not retried, since a second Gemini call would most likely fail the same way
+        retrieval_failed = (
+            llm_result.get("status") == "error"
+            and llm_result.get("failed_step") == "retrieval"
         )
+        if llm_result.get("status") == "empty" or retrieval_failed:
+            if retrieval_failed:
+                logger.error(f"Retrieval failed: {llm_result.get('error')}")
+            # Continue with empty context for general response
+            llm_result = coordinator.llm_agent.generate_response(query=query_text)
 
         processing_time = time.time() - start_time
 
@@ -324,12 +461,12 @@ def query():
         return jsonify(
             {
                 "answer": llm_result.get("answer", "No response generated"),
-                "context_chunks": context_chunks[
+                "context_chunks": llm_result.get("context_chunks", [])[
                     :3
                 ],  # Return first 3 chunks for display
-                "sources_used": len(context_chunks),
+                "sources_used": llm_result.get("sources_used", 0),
                 "response_type": llm_result.get("response_type", "unknown"),
-                "collection_size": retrieval_result.get("collection_size", 0),
+                "collection_size": collection_size,
                 "processing_time": round(processing_time, 2),
                 "trace_id": query_msg.trace_id,
                 "metadata": {
@@ -352,8 +489,12 @@ def clear_documents():
         return jsonify({"error": "System not initialized"}), 503
 
     try:
-        # Clear vector store
+        # Clear vector store and the embeddings cached for its content
         coordinator.retrieval_agent.clear_collection()
+        coordinator.retrieval_agent.clear_embedding_cache()
+        coordinator.semantic_cache.clear()
+        if coordinator.llm_agent.response_cache is not None:
+            coordinator.llm_agent.response_cache.clear()
 
         # Clear upload directory
         for filename in os.listdir(config.system.upload_folder):
@@ -21,7 +21,7 @@ class AgentConfig:
     # LLM Agent
     model_name: str = "gemini-2.0-flash"
     max_tokens: int = 2048
-    temperature: float = 0.7
+    temperature: float = 0.0
     
     # Vector Store
     collection_name: str = "document_store"
@@ -70,6 +70,7 @@ class Config:
         self.agent.default_search_k = int(os.getenv("DEFAULT_SEARCH_K", self.agent.default_search_k))
         self.agent.embedding_model = os.getenv("EMBEDDING_MODEL", self.agent.embedding_model)
         self.agent.model_name = os.getenv("LLM_MODEL", self.agent.model_name)
+        self.agent.temperature = float(os.getenv("TEMPERATURE", self.agent.temperature))
         
         # System config
         self.system.max_file_size_mb = int(os.getenv("MAX_FILE_SIZE_MB", self.system.max_file_size_mb))
@@ -0,0 +1,162 @@
+"""
+Shared pytest fixtures for the RAG test suite
+"""
+
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import NamedTuple
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_PORT = 8009
+
+# Tests report progress through logging; PERF_MODE=1 keeps only warnings for benchmark runs
+logging.basicConfig(
+    level=logging.WARNING if os.environ.get("PERF_MODE") else logging.INFO,
+    format="%(message)s"
+)
+
+
+@pytest.fixture(scope="session")
+def coordinator():
+    """
+    Coordinator shared by every test so the embedding model and vector store load once
+
+    This is the Flask app's coordinator: the broker appends handlers, so a second
+    agent graph would also receive every message.
+    """
+    from app import coordinator as app_coordinator
+    return app_coordinator
+
+
+def _server_ready(base_url):
+    try:
+        return requests.get(f'{base_url}/health', timeout=1).status_code == 200
+    except requests.exceptions.RequestException:
+        return False
+
+
+@pytest.fixture(scope="session")
+def base_url():
+    """Base URL of a running Flask app, booting one for the session if needed"""
+    url = f'http://127.0.0.1:{TEST_PORT}'
+
+    # Reuse a server the developer already started
+    if _server_ready(url):
+        yield url
+        return
+
+    env = {**os.environ, "API_HOST": "127.0.0.1", "API_PORT": str(TEST_PORT), "DEBUG": "false"}
+    process = subprocess.Popen([sys.executable, "app.py"], cwd=REPO_ROOT, env=env)
+
+    try:
+        deadline = time.time() + 120
+        while not _server_ready(url):
+            if process.poll() is not None:
+                pytest.fail(f"Flask app exited during startup with code {process.returncode}")
+            if time.time() > deadline:
+                pytest.fail("Timed out waiting for the Flask app to become healthy")
+            time.sleep(0.5)
+
+        yield url
+
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+@pytest.fixture(scope="session")
+def flask_session(base_url):
+    """Keep-alive HTTP session shared by the Flask API tests"""
+    http_session = requests.Session()
+    http_session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    yield http_session
+    http_session.close()
+
+
+@pytest.fixture(scope="session")
+def flask_client():
+    """Flask test client that dispatches requests through the WSGI stack in-process"""
+    from app import app
+    app.config["TESTING"] = True
+    return app.test_client()
+
+
+class APIResponse(NamedTuple):
+    """Status and body of an API call, independent of the transport"""
+    status_code: int
+    text: str
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class InProcessAPI:
+    """Calls the Flask app through its test client"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, path):
+        response = self.client.get(path)
+        return APIResponse(response.status_code, response.get_data(as_text=True))
+
+    def post(self, path, json=None, files=None, body=None, content_type=None, params=None):
+        kwargs = {"json": json, "query_string": params}
+        if files is not None:
+            kwargs["data"] = {"files": [(io.BytesIO(content), name, mimetype) for name, content, mimetype in files]}
+        elif body is not None:
+            # The test client needs the whole body up front
+            kwargs["data"] = body if isinstance(body, bytes) else b"".join(body)
+            kwargs["content_type"] = content_type
+
+        response = self.client.post(path, **kwargs)
+        return APIResponse(response.status_code, response.get_data(as_text=True))
+
+
+class HTTPAPI:
+    """Calls a running Flask app over TCP"""
+
+    def __init__(self, session, base_url):
+        self.session = session
+        self.base_url = base_url
+
+    def get(self, path):
+        response = self.session.get(f'{self.base_url}{path}', timeout=30)
+        return APIResponse(response.status_code, response.text)
+
+    def post(self, path, json=None, files=None, body=None, content_type=None, params=None):
+        if files is not None:
+            files = [('files', (name, io.BytesIO(content), mimetype)) for name, content, mimetype in files]
+        headers = {'Content-Type': content_type} if content_type else None
+
+        # A generator body is sent with chunked transfer encoding
+        response = self.session.post(
+            f'{self.base_url}{path}',
+            json=json,
+            files=files,
+            data=body,
+            headers=headers,
+            params=params,
+            timeout=30
+        )
+        return APIResponse(response.status_code, response.text)
+
+
+@pytest.fixture(scope="session", params=["inprocess", pytest.param("http", marks=pytest.mark.http)])
+def api(request):
+    """Flask API client; in-process by default, over TCP for tests selected with -m http"""
+    if request.param == "http":
+        return HTTPAPI(request.getfixturevalue("flask_session"), request.getfixturevalue("base_url"))
+    return InProcessAPI(request.getfixturevalue("flask_client"))
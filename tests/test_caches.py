@@ -0,0 +1,144 @@
+"""
+Unit tests for the in-process caches and the rate limiter
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import utils.rate_limiter as rate_limiter
+import utils.response_cache as response_cache
+from utils.rate_limiter import RateLimiter
+from utils.response_cache import ResponseCache
+
+
+class FakeClock:
+    """Manually advanced clock standing in for the time module"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    fake_time = SimpleNamespace(time=fake, monotonic=fake)
+    monkeypatch.setattr(response_cache, "time", fake_time)
+    monkeypatch.setattr(rate_limiter, "time", fake_time)
+    return fake
+
+
+def test_response_cache_key_depends_on_every_part():
+    assert ResponseCache.make_key("rag", "a", "b") == ResponseCache.make_key("rag", "a", "b")
+    assert ResponseCache.make_key("rag", "a", "b") != ResponseCache.make_key("rag", "a", "c")
+
+
+def test_response_cache_expires_entries(clock):
+    cache = ResponseCache(ttl_seconds=10)
+    cache.set("key", "answer")
+
+    clock.now += 9
+    assert cache.contains("key")
+    assert cache.get("key") == "answer"
+
+    clock.now += 2
+    assert not cache.contains("key")
+    assert cache.get("key") is None
+    assert cache.get_stats()["entries"] == 0
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_response_cache_evicts_least_recently_used(clock):
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats["evictions"] == 1
+
+
+def test_response_cache_clear(clock):
+    cache = ResponseCache()
+    cache.set("a", 1)
+    cache.clear()
+
+    assert cache.get("a") is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_rate_limiter_refills_over_time(clock):
+    limiter = RateLimiter(rate=1.0)
+
+    assert limiter.allow()
+    assert not limiter.allow()
+
+    clock.now += 0.5
+    assert not limiter.allow()
+
+    clock.now += 0.5
+    assert limiter.allow()
+    assert not limiter.allow()
+
+
+def test_rate_limiter_caps_burst(clock):
+    limiter = RateLimiter(rate=1.0, burst=2)
+
+    # A long idle period still only allows `burst` actions in a row
+    clock.now += 60
+    assert [limiter.allow() for _ in range(3)] == [True, True, False]
+
+
+def test_semantic_cache_hits_similar_vectors():
+    pytest.importorskip("numpy")
+    from utils.semantic_cache import SemanticCache
+
+    cache = SemanticCache(similarity_threshold=0.95)
+    cache.add([1.0, 0.0], "x-axis")
+
+    assert cache.lookup([2.0, 0.01]) == "x-axis"
+    assert cache.lookup([0.0, 1.0]) is None
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_semantic_cache_evicts_least_recently_used():
+    pytest.importorskip("numpy")
+    from utils.semantic_cache import SemanticCache
+
+    cache = SemanticCache(similarity_threshold=0.95, max_entries=2)
+    cache.add([1.0, 0.0, 0.0], "a")
+    cache.add([0.0, 1.0, 0.0], "b")
+
+    # Looking up "a" makes "b" the least recently used entry
+    assert cache.lookup([1.0, 0.0, 0.0]) == "a"
+    cache.add([0.0, 0.0, 1.0], "c")
+
+    assert cache.lookup([0.0, 1.0, 0.0]) is None
+    assert cache.lookup([1.0, 0.0, 0.0]) == "a"
+    assert cache.lookup([0.0, 0.0, 1.0]) == "c"
+    assert cache.get_stats()["entries"] == 2
+    assert cache.stats["evictions"] == 1
+
+
+def test_semantic_cache_lookup_skips_values_that_do_not_match():
+    pytest.importorskip("numpy")
+    from utils.semantic_cache import SemanticCache
+
+    cache = SemanticCache(similarity_threshold=0.95)
+    cache.add([1.0, 0.0], {"search_k": 5})
+    cache.add([1.0, 0.01], {"search_k": 3})
+
+    assert cache.lookup([1.0, 0.0], matches=lambda value: value["search_k"] == 3) == {"search_k": 3}
+    assert cache.lookup([1.0, 0.0], matches=lambda value: value["search_k"] == 10) is None
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
@@ -0,0 +1,267 @@
+"""
+Offline tests for the LLM agent, with Gemini replaced by a scripted fake model
+"""
+
+import string
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from google.api_core.exceptions import ServiceUnavailable
+
+import agents.mcp_llm_agent as llm_module
+import utils.mcp_client as mcp_client
+from agents.mcp_llm_agent import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RECOVERY_SECONDS, MCPLLMAgent
+from utils.mcp import MCPBroker, MCPMessage, MessageType
+
+
+class FakeResponse:
+    """Non-streamed Gemini response"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeStream:
+    """Streamed Gemini response yielding one chunk per word"""
+
+    def __init__(self, text):
+        self.pieces = [piece + " " for piece in text.split(" ")]
+
+    async def __aiter__(self):
+        for piece in self.pieces:
+            yield FakeResponse(piece)
+
+
+class FakeGemini:
+    """Scripted replies shared by every fake model; an exception reply is raised"""
+
+    def __init__(self):
+        self.replies = []
+        self.prompts = []
+
+    def model(self, *args, **kwargs):
+        return SimpleNamespace(generate_content_async=self.generate_content_async)
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.prompts.append(prompt)
+        reply = self.replies.pop(0) if self.replies else "## 📋 Quick Answer\nStub answer"
+        if isinstance(reply, Exception):
+            raise reply
+        return FakeStream(reply) if stream else FakeResponse(reply)
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    """Fresh message broker so the test's agents and handlers stay isolated"""
+    test_broker = MCPBroker()
+    monkeypatch.setattr(mcp_client, "broker", test_broker)
+    monkeypatch.setattr(llm_module, "broker", test_broker)
+    return test_broker
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """Fake Gemini API used by agents built in the test"""
+    fake = FakeGemini()
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(llm_module.genai, "configure", lambda **kwargs: None)
+    monkeypatch.setattr(llm_module.genai, "GenerativeModel", fake.model)
+    return fake
+
+
+@pytest.fixture
+def llm_agent(broker, gemini):
+    """LLM agent talking to the fake Gemini API"""
+    agent = MCPLLMAgent()
+    yield agent
+    agent.close()
+
+
+def test_response_chunks_reach_workflow(broker, gemini, llm_agent):
+    """Streamed deltas are kept on the workflow that issued the query"""
+    from agents.mcp_coordinator import MCPCoordinatorAgent
+    from agents.mcp_retrieval_agent import MCPRetrievalAgent
+
+    workflow_id = "workflow-1"
+    coordinator = SimpleNamespace(active_workflows={workflow_id: {"id": workflow_id}})
+    generated = []
+    done = threading.Event()
+
+    def on_generated(message):
+        generated.append(message)
+        done.set()
+
+    broker.register_handler(
+        "CoordinatorAgent", MessageType.RESPONSE_CHUNK.value,
+        lambda message: MCPCoordinatorAgent.handle_response_chunk(coordinator, message)
+    )
+    broker.register_handler("CoordinatorAgent", MessageType.RESPONSE_GENERATED.value, on_generated)
+
+    # Retrieval agent with a one-document store, sending through the test broker
+    retrieval_client = mcp_client.MCPClient("RetrievalAgent")
+    retrieval = SimpleNamespace(
+        stats={"queries_processed": 0, "errors": 0},
+        vector_store=SimpleNamespace(
+            search_with_metadata=lambda query, k: [
+                {"document": "Sales grew 12%", "metadata": {"file_name": "sales.txt"}}
+            ],
+            get_collection_info=lambda: {"count": 1},
+        ),
+        send_message=retrieval_client.send,
+    )
+
+    # The coordinator forwards QUERY_REQUEST with the workflow id as its trace id
+    gemini.replies.append("Sales grew twelve percent")
+    MCPRetrievalAgent.handle_query_request(retrieval, MCPMessage.create(
+        sender="CoordinatorAgent",
+        receiver="RetrievalAgent",
+        msg_type=MessageType.QUERY_REQUEST.value,
+        payload={"query": "How did sales change?"},
+        trace_id=workflow_id,
+    ))
+
+    assert done.wait(timeout=5), "No RESPONSE_GENERATED received"
+    assert generated[0].metadata["workflow_id"] == workflow_id
+    chunks = coordinator.active_workflows[workflow_id]["response_chunks"]
+    assert "".join(chunks).strip() == "Sales grew twelve percent"
+
+
+def test_failed_generation_removes_workflow(broker, gemini, llm_agent):
+    """A Gemini failure reaches the coordinator, which fails and drops the workflow"""
+    from agents.mcp_coordinator import MCPCoordinatorAgent
+
+    workflow_id = "workflow-1"
+    coordinator = SimpleNamespace(
+        agent_id="CoordinatorAgent",
+        active_workflows={workflow_id: {"id": workflow_id, "original_sender": "CoordinatorAgent"}},
+    )
+    failed = threading.Event()
+
+    def on_error(message):
+        MCPCoordinatorAgent.handle_error(coordinator, message)
+        failed.set()
+
+    broker.register_handler("CoordinatorAgent", MessageType.ERROR.value, on_error)
+
+    gemini.replies.append(ServiceUnavailable("Gemini is down"))
+    message = retrieval_result("How did sales change?", ["Sales grew 12%"])
+    message.metadata["workflow_id"] = workflow_id
+    llm_agent._run_async(llm_agent._handle_retrieval_result(message))
+
+    assert failed.wait(timeout=5), "No ERROR received"
+    assert workflow_id not in coordinator.active_workflows
+
+
+def retrieval_result(query, chunks):
+    """RETRIEVAL_RESULT message as sent by the retrieval agent"""
+    return MCPMessage.create(
+        sender="RetrievalAgent",
+        receiver="LLMResponseAgent",
+        msg_type=MessageType.RETRIEVAL_RESULT.value,
+        payload={
+            "query": query,
+            "top_chunks": chunks,
+            "chunk_file_names": ["notes.txt"] * len(chunks),
+        },
+    )
+
+
+def collect(broker, receiver, msg_type):
+    """Record messages of one type sent to a receiver"""
+    received = []
+    broker.register_handler(receiver, msg_type, received.append)
+    return received
+
+
+@pytest.mark.parametrize("name", sorted(MCPLLMAgent.templates))
+def test_compiled_templates_match_str_format(name):
+    template = MCPLLMAgent.templates[name]
+    fields = {field for _, field, _, _ in string.Formatter().parse(template) if field}
+    values = {field: f"<{field} value>" for field in fields}
+
+    assert MCPLLMAgent._formatters[name](**values) == template.format(**values)
+
+
+def test_split_batch_answers():
+    text = (
+        "=== ANSWER 1 ===\nFirst answer\n\n"
+        "=== ANSWER 3 === \nThird answer\n"
+        "=== ANSWER 2 ===\n   \n"
+    )
+
+    # Blank and missing answers come back as None so they can be retried
+    assert MCPLLMAgent._split_batch_answers(text, 4) == ["First answer", None, "Third answer", None]
+
+
+def test_chunks_without_file_names_are_labelled_unknown(llm_agent):
+    prompt, sources, _ = llm_agent._build_rag_prompt(["alpha", "beta"], [], "query")
+
+    assert "[Document 1 (unknown)]\nalpha" in prompt
+    assert "[Document 2 (unknown)]\nbeta" in prompt
+    assert sources == ("unknown",)
+
+
+def test_failed_generation_is_reported_as_error(gemini, llm_agent):
+    gemini.replies.append(ServiceUnavailable("Gemini is down"))
+
+    result = llm_agent.generate_response("What changed?", context_chunks=["Sales grew 12%"])
+
+    assert result["status"] == "error"
+    assert llm_agent.stats["processing_errors"] == 1
+    assert llm_agent.stats["rag_responses"] == 0
+
+
+def test_circuit_opens_after_consecutive_api_failures(gemini, llm_agent):
+    gemini.replies.extend([ServiceUnavailable("Gemini is down")] * CIRCUIT_FAILURE_THRESHOLD)
+
+    for i in range(CIRCUIT_FAILURE_THRESHOLD):
+        assert llm_agent.generate_response(f"query {i}")["status"] == "error"
+
+    # The open circuit fails fast without calling the API
+    result = llm_agent.generate_response("one more query")
+    assert result["status"] == "error"
+    assert "unavailable" in result["error"]
+    assert len(gemini.prompts) == CIRCUIT_FAILURE_THRESHOLD
+
+    # After the recovery timeout a successful call closes it again
+    llm_agent.last_failure_time -= CIRCUIT_RECOVERY_SECONDS
+    assert llm_agent.generate_response("after recovery")["status"] == "success"
+    assert llm_agent._consecutive_failures == 0
+
+
+def test_content_errors_do_not_open_circuit(gemini, llm_agent):
+    gemini.replies.extend([ValueError("Response was blocked")] * CIRCUIT_FAILURE_THRESHOLD)
+
+    for i in range(CIRCUIT_FAILURE_THRESHOLD):
+        assert llm_agent.generate_response(f"query {i}")["status"] == "error"
+
+    assert llm_agent.generate_response("allowed query")["status"] == "success"
+    assert len(gemini.prompts) == CIRCUIT_FAILURE_THRESHOLD + 1
+
+
+def test_failed_batch_replies_with_errors_without_retrying(broker, gemini, llm_agent):
+    errors = collect(broker, "CoordinatorAgent", MessageType.ERROR.value)
+    gemini.replies.append(ServiceUnavailable("Gemini is down"))
+
+    messages = [retrieval_result(f"query {i}", [f"chunk {i}"]) for i in range(3)]
+    llm_agent._run_async(llm_agent._process_batch(messages))
+
+    assert len(gemini.prompts) == 1
+    assert len(errors) == 3
+    assert llm_agent.stats["processing_errors"] == 3
+
+
+def test_missing_batch_answers_are_retried_individually(broker, gemini, llm_agent):
+    generated = collect(broker, "CoordinatorAgent", MessageType.RESPONSE_GENERATED.value)
+    gemini.replies.extend(["=== ANSWER 1 ===\nFirst answer", "Second answer"])
+
+    messages = [retrieval_result(f"query {i}", [f"chunk {i}"]) for i in range(2)]
+    llm_agent._run_async(llm_agent._process_batch(messages))
+
+    assert len(gemini.prompts) == 2
+    assert sorted(message.payload["query"] for message in generated) == ["query 0", "query 1"]
+    assert llm_agent.stats["rag_responses"] == 2
@@ -0,0 +1,372 @@
+"""
+End-to-end tests for the RAG pipeline and the Flask API
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pytest
+
+# Every test shares the persistent vector store, so keep them on one pytest-xdist worker
+pytestmark = pytest.mark.xdist_group("vector_store")
+
+log = logging.getLogger(__name__)
+
+
+# Fixture documents are bytes constants so uploads and temp files use them without re-encoding
+INVENTORY_TXT = b"""
+    Store Inventory Analysis Report
+
+    This document contains analysis of store inventory data including:
+    - Product categories and their performance
+    - Sales trends over the past quarter
+    - Inventory turnover rates
+    - Recommendations for stock optimization
+
+    Key findings:
+    - Electronics category shows highest sales volume
+    - Clothing inventory has slow turnover
+    - Seasonal items need better forecasting
+    - Overall inventory efficiency is 78%
+    """
+
+SALES_TXT = b"""
+    Sales Performance Report Q4 2024
+
+    Monthly Sales Data:
+    January: $45,000
+    February: $52,000
+    March: $48,000
+    April: $61,000
+    May: $58,000
+    June: $67,000
+    July: $82,000 (highest)
+    August: $75,000
+    September: $69,000
+    October: $71,000
+    November: $64,000
+    December: $59,000
+
+    Product Categories:
+    - Electronics: 35% of total sales
+    - Clothing: 28% of total sales
+    - Home & Garden: 22% of total sales
+    - Books & Media: 15% of total sales
+
+    Key Performance Indicators:
+    - Average monthly sales: $62,583
+    - Growth rate: 12% year-over-year
+    - Customer satisfaction: 4.2/5.0
+    - Return rate: 3.1%
+
+    Top Performing Products:
+    1. Smartphone Pro Max - $15,000 revenue
+    2. Wireless Headphones - $12,500 revenue
+    3. Smart Watch Series 5 - $11,200 revenue
+    4. Laptop Gaming Edition - $9,800 revenue
+    5. Tablet Ultra - $8,900 revenue
+    """
+
+CSV_DATA = b"""Product,Category,Stock,Sales,Price
+iPhone 14,Electronics,50,120,999
+Samsung TV,Electronics,25,80,799
+Nike Shoes,Clothing,100,200,129
+Adidas Shirt,Clothing,150,180,49
+Coffee Maker,Home,30,45,89
+Blender,Home,20,35,79
+Python Book,Books,40,15,39
+JavaScript Guide,Books,35,12,45"""
+
+INVENTORY_REPORT_TXT = b"""
+    Store Inventory Analysis Report
+
+    This document contains detailed analysis of our store inventory:
+
+    Key Metrics:
+    - Total inventory value: $2.5M
+    - Inventory turnover: 4.2x annually
+    - Out-of-stock rate: 3.2%
+    - Overstock items: 15% of total SKUs
+
+    Category Performance:
+    - Electronics: 35% of sales, high demand
+    - Clothing: 28% of sales, seasonal variations
+    - Home goods: 22% of sales, steady demand
+    - Books: 15% of sales, declining trend
+
+    Recommendations:
+    1. Increase electronics inventory by 20%
+    2. Implement better forecasting for clothing
+    3. Reduce book inventory gradually
+    4. Focus on fast-moving home goods
+    """
+
+CLEAR_MEMORY_TXT = b"""
+    Test Document for Clear Memory
+
+    This document contains test data that should be cleared:
+    - Product A: $100
+    - Product B: $200
+    - Product C: $300
+
+    Total inventory value: $600
+    """
+
+DOCUMENT_FIXTURES = [
+    pytest.param(
+        "inventory_analysis.txt",
+        INVENTORY_TXT,
+        [
+            "What is the inventory efficiency?",
+            "Which category has the highest sales?",
+            "What are the key findings?",
+            "Tell me about clothing inventory"
+        ],
+        id="inventory"
+    ),
+    pytest.param(
+        "sales_report.txt",
+        SALES_TXT,
+        [
+            "What was the highest sales month and what was the amount?",
+            "Show me the product category breakdown",
+            "What are the key performance indicators?",
+            "List the top 5 performing products with their revenue",
+            "Create a summary of the sales performance"
+        ],
+        id="sales"
+    ),
+    pytest.param(
+        "store_inventory.csv",
+        CSV_DATA,
+        [
+            "What products are in the Electronics category?",
+            "Which product has the highest sales?",
+            "What is the price of Nike Shoes?",
+            "How many books are in stock?",
+            "What categories are available?"
+        ],
+        id="csv"
+    )
+]
+
+
+def wait_indexed(coordinator, timeout=10, interval=0.1):
+    """Poll the retrieval agent until the collection has documents or the timeout expires"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if coordinator.retrieval_agent.get_collection_info()['count'] > 0:
+            return True
+        time.sleep(interval)
+    return False
+
+
+def wait_for_collection(api, timeout=10, interval=0.1):
+    """Poll the Flask /status endpoint until the collection has documents or the timeout expires"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = api.get('/status')
+        if response.status_code == 200 and response.json().get('collection_size', 0) > 0:
+            return True
+        time.sleep(interval)
+    return False
+
+
+def upload_documents(api, documents):
+    """Upload (filename, bytes) pairs in a single multipart request, straight from memory"""
+    files = [(name, content, 'text/plain') for name, content in documents]
+    return api.post('/upload', files=files)
+
+
+def post_query(api, query, **params):
+    """Send a query to the Flask /query endpoint"""
+    return api.post('/query', json={"query": query, **params})
+
+
+@pytest.mark.parametrize("filename, content, queries", DOCUMENT_FIXTURES)
+def test_upload_query(coordinator, tmp_path, filename, content, queries):
+    """Index a document through the coordinator and answer queries about it"""
+
+    log.info(f"=== Testing Upload and Query: {filename} ===")
+
+    # Start from an empty collection
+    coordinator.retrieval_agent.clear_collection()
+
+    test_file = tmp_path / filename
+    test_file.write_bytes(content)
+
+    result = coordinator.process_document(str(test_file))
+    log.info(f"   Processing started: {result}")
+
+    if not wait_indexed(coordinator):
+        log.warning("   ⚠️  Timed out waiting for indexing")
+
+    collection_info = coordinator.retrieval_agent.get_collection_info()
+    log.info(f"   Collection info: {collection_info}")
+
+    assert collection_info['count'] > 0, "No documents were indexed"
+
+    # Embed every query in one batch, then generate the answers concurrently
+    contexts = coordinator.retrieval_agent.retrieve_contexts_batch(queries, k=5, similarity_threshold=0.7)
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        futures = {
+            executor.submit(coordinator.answer, query, retrieval_result=context): query
+            for query, context in zip(queries, contexts)
+        }
+        results = {futures[future]: future.result() for future in as_completed(futures)}
+
+    for i, query in enumerate(queries, 1):
+        log.info(f"\n   Query {i}: {query}")
+
+        result = results[query]
+        assert result.get('status') in ('success', 'empty'), f"Query failed: {result.get('error')}"
+
+        if result.get('status') == 'empty':
+            log.warning("   ⚠️  No relevant context found")
+            continue
+
+        log.info(f"   Response Type: {result.get('response_type')}")
+        log.info(f"   Sources Used: {result.get('sources_used', 0)}")
+        log.info(f"   ✅ Answer: {result['answer'][:150]}...")
+
+    assert any(result.get('response_type') == 'rag' for result in results.values()), \
+        "No query was answered from the indexed document"
+
+    log.info(f"\n=== Upload and Query Test Complete: {filename} ===")
+
+
+def test_flask_api(api):
+    """Test the Flask API endpoints"""
+
+    log.info("=== Testing Flask API ===")
+
+    response = api.get('/health')
+    assert response.status_code == 200, f"Health check failed: {response.text}"
+    log.info(f"   System status: {response.json().get('status')}")
+
+    response = api.post('/clear')
+    assert response.status_code == 200, f"Clear failed: {response.text}"
+
+    response = upload_documents(api, [('inventory_report.txt', INVENTORY_REPORT_TXT)])
+    assert response.status_code in [200, 207], f"Upload error: {response.text}"
+    log.info(f"   Upload result: {response.json().get('message')}")
+
+    assert wait_for_collection(api), "Timed out waiting for indexing"
+
+    test_queries = [
+        "What is the total inventory value?",
+        "Which category has the highest sales percentage?",
+        "What are the recommendations?",
+        "What is the inventory turnover rate?"
+    ]
+
+    # Queries are independent, so issue them concurrently
+    with ThreadPoolExecutor(max_workers=len(test_queries)) as executor:
+        futures = {
+            executor.submit(post_query, api, query, search_k=3): query
+            for query in test_queries
+        }
+        responses = {futures[future]: future.result() for future in as_completed(futures)}
+
+    for i, query in enumerate(test_queries, 1):
+        log.info(f"\n   Query {i}: {query}")
+
+        response = responses[query]
+        assert response.status_code == 200, f"Query failed: {response.status_code} - {response.text}"
+
+        result = response.json()
+        log.info(f"   Answer: {result.get('answer', 'No answer')[:100]}...")
+        log.info(f"   Sources used: {result.get('sources_used', 0)}")
+        log.info(f"   Collection size: {result.get('collection_size', 0)}")
+
+    log.info("\n=== Flask API Test Complete ===")
+
+
+def test_batch_upload(api):
+    """Test uploading every fixture document in one request to the parallel batch endpoint"""
+
+    log.info("=== Testing Batch Upload ===")
+
+    api.post('/clear')
+
+    documents = [
+        ('inventory_analysis.txt', INVENTORY_TXT, 'text/plain'),
+        ('sales_report.txt', SALES_TXT, 'text/plain'),
+        ('store_inventory.csv', CSV_DATA, 'text/csv')
+    ]
+    response = api.post('/upload/batch', files=documents)
+
+    log.info(f"   Upload status: {response.status_code}")
+    assert response.status_code == 200, f"Batch upload error: {response.text}"
+    assert sorted(response.json().get('uploaded_files', [])) == sorted(name for name, _, _ in documents)
+
+    assert wait_for_collection(api), "Timed out waiting for indexing"
+
+    log.info("\n=== Batch Upload Test Complete ===")
+
+
+def test_stream_csv_upload(api):
+    """Test uploading a raw CSV body, streamed with chunked transfer encoding over HTTP"""
+
+    log.info("=== Testing Streamed CSV Upload ===")
+
+    # Over HTTP a generator body is sent as the rows are produced
+    def generate_rows():
+        for row in CSV_DATA.splitlines(keepends=True):
+            yield row
+
+    response = api.post(
+        '/upload',
+        params={'filename': 'streamed_inventory.csv'},
+        body=generate_rows(),
+        content_type='text/csv'
+    )
+
+    log.info(f"   Upload status: {response.status_code}")
+    assert response.status_code == 200, f"Streamed upload error: {response.text}"
+    assert response.json().get('uploaded_files') == ['streamed_inventory.csv']
+
+    assert wait_for_collection(api), "Timed out waiting for indexing"
+
+    log.info("\n=== Streamed CSV Upload Test Complete ===")
+
+
+def test_clear_memory(api):
+    """Test that /clear removes indexed documents"""
+
+    log.info("=== Testing Clear Memory Functionality ===")
+
+    response = upload_documents(api, [('clear_memory_test.txt', CLEAR_MEMORY_TXT)])
+    assert response.status_code in [200, 207], f"Upload failed: {response.status_code} - {response.text}"
+    log.info("   ✅ Document uploaded successfully")
+
+    assert wait_for_collection(api), "Timed out waiting for indexing"
+
+    query = "What is the total inventory value?"
+
+    response = post_query(api, query)
+    assert response.status_code == 200, f"Query failed: {response.status_code} - {response.text}"
+    result = response.json()
+    log.info(f"   ✅ Query before clear: {result.get('answer', 'No answer')[:100]}...")
+    assert result.get('sources_used', 0) > 0, "No sources found before clear"
+
+    response = api.post('/clear')
+    assert response.status_code == 200, f"Clear failed: {response.status_code} - {response.text}"
+    log.info(f"   ✅ Clear successful: {response.json().get('message')}")
+
+    # The same query after clearing should find no sources
+    response = post_query(api, query)
+    assert response.status_code == 200, f"Query after clear failed: {response.status_code} - {response.text}"
+    result = response.json()
+    assert result.get('sources_used', 0) == 0, "Sources still found after clear"
+    log.info("   ✅ No sources found after clear - memory was cleared successfully")
+
+    response = api.get('/health')
+    if response.status_code == 200:
+        log.info(f"   ✅ System healthy: {response.json().get('status')}")
+    else:
+        log.warning(f"   ⚠️  Health check issue: {response.status_code}")
+
+    log.info("\n=== Clear Memory Test Complete ===")
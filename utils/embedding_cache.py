@@ -0,0 +1,142 @@
+"""
+Persistent embedding cache
+
+This module wraps a ChromaDB embedding function with a SQLite-backed cache keyed by
+the SHA-256 of the text plus the embedding provider and model, so identical document
+chunks are only embedded once.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Dict, List
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on host parameters is 999
+_SELECT_BATCH_SIZE = 500
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Embedding function that serves repeated texts from a local cache
+
+    Only texts missing from the cache are passed to the wrapped embedding function;
+    their vectors are written back so later calls can reuse them.
+    """
+
+    def __init__(self, embedding_function: EmbeddingFunction, provider: str, model_name: str, cache_path: str):
+        """
+        Initialize cached embedding function
+
+        Args:
+            embedding_function: Embedding function used for cache misses
+            provider: Embedding provider name, part of the cache key
+            model_name: Embedding model name, part of the cache key
+            cache_path: Path of the SQLite cache database
+        """
+        self.embedding_function = embedding_function
+        self.provider = provider
+        self.model_name = model_name
+        self.cache_path = cache_path
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                hash TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (hash, provider, model)
+            )"""
+        )
+        self._conn.commit()
+
+        self.stats = {
+            "cache_hits": 0,
+            "cache_misses": 0
+        }
+
+        logger.info(f"Embedding cache initialized at {cache_path}")
+
+    def __call__(self, input: Documents) -> Embeddings:
+        hashes = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in input]
+        cached = self._lookup(set(hashes))
+
+        uncached_texts = []
+        uncached_idx = []
+        for i, text_hash in enumerate(hashes):
+            if text_hash not in cached:
+                uncached_texts.append(input[i])
+                uncached_idx.append(i)
+
+        if uncached_texts:
+            new_embeddings = self.embedding_function(uncached_texts)
+            self._store([(hashes[i], embedding) for i, embedding in zip(uncached_idx, new_embeddings)])
+            for i, embedding in zip(uncached_idx, new_embeddings):
+                cached[hashes[i]] = list(embedding)
+
+        with self._lock:
+            self.stats["cache_hits"] += len(input) - len(uncached_texts)
+            self.stats["cache_misses"] += len(uncached_texts)
+
+        return [cached[text_hash] for text_hash in hashes]
+
+    def _lookup(self, hashes: set) -> Dict[str, List[float]]:
+        """Fetch cached vectors for the given hashes"""
+        hash_list = list(hashes)
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(hash_list), _SELECT_BATCH_SIZE):
+                batch = hash_list[start:start + _SELECT_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings "
+                    f"WHERE provider = ? AND model = ? AND hash IN ({placeholders})",
+                    [self.provider, self.model_name, *batch]
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+        return found
+
+    def _store(self, items):
+        """Upsert (hash, embedding) pairs into the cache"""
+        rows = [
+            (text_hash, self.provider, self.model_name, np.asarray(embedding, dtype=np.float32).tobytes())
+            for text_hash, embedding in items
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, provider, model, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all cached embeddings"""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self.stats = {
+                "cache_hits": 0,
+                "cache_misses": 0
+            }
+
+        logger.info("Embedding cache cleared")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache statistics"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return {
+                **self.stats,
+                "cached_embeddings": size
+            }
@@ -27,12 +27,14 @@ class MessageType(Enum):
     CONTEXT_RESPONSE = "CONTEXT_RESPONSE"
     RETRIEVAL_RESULT = "RETRIEVAL_RESULT"
     RESPONSE_GENERATED = "RESPONSE_GENERATED"
+    RESPONSE_CHUNK = "RESPONSE_CHUNK"
     
     # System messages
     ERROR = "ERROR"
     HEALTH_CHECK = "HEALTH_CHECK"
     AGENT_STATUS = "AGENT_STATUS"
     SYSTEM_STATUS = "SYSTEM_STATUS"
+    STATS_REQUEST = "STATS_REQUEST"
     
     # Workflow control
     WORKFLOW_START = "WORKFLOW_START"
@@ -0,0 +1,51 @@
+"""
+Token-bucket rate limiter
+
+This module limits how often an action may run, such as writing a full traceback
+to the log while errors are arriving in bursts.
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket refilled at a fixed rate
+
+    Each allowed action takes one token; when the bucket is empty the action is
+    refused until it refills.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 1):
+        """
+        Initialize rate limiter
+
+        Args:
+            rate: Tokens added per second
+            burst: Maximum number of tokens held at once
+        """
+        self.rate = rate
+        self.burst = burst
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def allow(self) -> bool:
+        """
+        Take a token if one is available
+
+        Returns:
+            True if the action may run, False if it should be skipped
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+            return True
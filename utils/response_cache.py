@@ -0,0 +1,111 @@
+"""
+Exact-match LLM response cache
+
+This module caches generated responses keyed by a hash of everything that went into
+the prompt, so a repeated request is answered without calling the model again.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    In-process cache with a time-to-live and least-recently-used eviction
+
+    Only use it for deterministic generation (temperature 0); otherwise a cached
+    response hides the variation the caller asked for.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600):
+        """
+        Initialize response cache
+
+        Args:
+            max_entries: Maximum number of cached responses
+            ttl_seconds: Seconds a cached response stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0
+        }
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Build a cache key from the parts of a prompt"""
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached response
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cached response, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def contains(self, key: str) -> bool:
+        """Check for an unexpired response without counting a hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] >= time.time()
+
+    def set(self, key: str, value: Any):
+        """
+        Cache a response, evicting the least recently used one when full
+
+        Args:
+            key: Cache key from make_key()
+            value: Response to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock:
+            self._entries.clear()
+
+        logger.info("Response cache cleared")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds
+            }
@@ -0,0 +1,134 @@
+"""
+Semantic query cache
+
+This module caches query results keyed by the query embedding. A lookup hits when a
+cached query is within a cosine-similarity threshold of the new one, so repeated and
+near-duplicate queries skip retrieval and generation entirely.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Similarity-keyed cache with least-recently-used eviction
+
+    Cached query vectors are kept L2-normalised in one (n, dim) matrix so a lookup
+    is a single matrix-vector product.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.95, max_entries: int = 256):
+        """
+        Initialize semantic cache
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for a cache hit
+            max_entries: Maximum number of cached queries
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._values: List[Any] = []
+        self._last_used: List[int] = []
+        self._clock = 0
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0
+        }
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, vector, matches: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """
+        Find a cached value for a query vector
+
+        Args:
+            vector: Query embedding
+            matches: Optional predicate a cached value must satisfy to be returned
+
+        Returns:
+            Cached value of the most similar query, or None if none is similar enough
+        """
+        query = self._normalize(vector)
+
+        with self._lock:
+            if self._vectors is None:
+                self.stats["misses"] += 1
+                return None
+
+            scores = self._vectors @ query
+            if matches is not None:
+                allowed = np.fromiter((matches(value) for value in self._values), dtype=bool,
+                                      count=len(self._values))
+                scores = np.where(allowed, scores, -np.inf)
+            best = int(np.argmax(scores))
+
+            if scores[best] < self.similarity_threshold:
+                self.stats["misses"] += 1
+                return None
+
+            self._clock += 1
+            self._last_used[best] = self._clock
+            self.stats["hits"] += 1
+            return self._values[best]
+
+    def add(self, vector, value: Any):
+        """
+        Cache a value for a query vector, evicting the least recently used entry when full
+
+        Args:
+            vector: Query embedding
+            value: Value to cache
+        """
+        query = self._normalize(vector)
+
+        with self._lock:
+            self._clock += 1
+
+            if self._vectors is None:
+                self._vectors = query[np.newaxis, :]
+                self._values.append(value)
+                self._last_used.append(self._clock)
+            elif len(self._values) < self.max_entries:
+                self._vectors = np.vstack([self._vectors, query])
+                self._values.append(value)
+                self._last_used.append(self._clock)
+            else:
+                oldest = int(np.argmin(self._last_used))
+                self._vectors[oldest] = query
+                self._values[oldest] = value
+                self._last_used[oldest] = self._clock
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            self._vectors = None
+            self._values = []
+            self._last_used = []
+
+        logger.info("Semantic cache cleared")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                **self.stats,
+                "entries": len(self._values),
+                "max_entries": self.max_entries,
+                "similarity_threshold": self.similarity_threshold
+            }
@@ -2,8 +2,11 @@ import chromadb
 from chromadb.utils import embedding_functions
 from typing import List, Dict, Any, Optional
 import logging
+import os
 import time
 import hashlib
+import threading
+from .embedding_cache import CachedEmbeddingFunction
 
 logger = logging.getLogger(__name__)
 
@@ -14,10 +17,17 @@ class VectorStore:
         self.collection_name = collection_name
         self.embedding_model = embedding_model
         
-        # Use SentenceTransformer embedding function
+        # Use SentenceTransformer embedding function; document chunks also go through a
+        # content-hash cache, while queries are embedded directly so they are never stored
         self.sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
             model_name=embedding_model
         )
+        self.embedding_cache = CachedEmbeddingFunction(
+            self.sentence_transformer_ef,
+            provider="sentence-transformers",
+            model_name=embedding_model,
+            cache_path=os.path.join(persist_directory, "embedding_cache.sqlite3")
+        )
         
         # Create collection with embedding function
         self.collection = self.client.get_or_create_collection(
@@ -25,8 +35,10 @@ class VectorStore:
             embedding_function=self.sentence_transformer_ef
         )
         
-        # Keep track of document count for ID generation
+        # Keep track of document count for ID generation; the lock keeps IDs unique
+        # when documents are added from several threads
         self.doc_count = self.collection.count()
+        self._add_lock = threading.Lock()
         self.stats = {
             "documents_added": 0,
             "searches_performed": 0,
@@ -43,42 +55,47 @@ class VectorStore:
             return
         
         try:
-            # Generate unique IDs for each chunk
-            ids = []
-            metadatas = []
-            
-            for i, chunk in enumerate(chunks):
-                # Create unique ID based on content hash and timestamp
-                chunk_hash = hashlib.md5(chunk.encode()).hexdigest()[:8]
-                doc_id = f"doc_{self.doc_count + i}_{chunk_hash}"
-                ids.append(doc_id)
+            # Embed outside the lock so concurrent ingestions overlap on the model
+            embeddings = self.embedding_cache(chunks)
+            
+            with self._add_lock:
+                # Generate unique IDs for each chunk
+                ids = []
+                metadatas = []
                 
-                # Prepare metadata for each chunk
-                chunk_metadata = {
-                    "chunk_index": i,
-                    "chunk_length": len(chunk),
-                    "added_timestamp": time.time(),
-                    "doc_id": doc_id
-                }
+                for i, chunk in enumerate(chunks):
+                    # Create unique ID based on content hash and timestamp
+                    chunk_hash = hashlib.md5(chunk.encode()).hexdigest()[:8]
+                    doc_id = f"doc_{self.doc_count + i}_{chunk_hash}"
+                    ids.append(doc_id)
+                    
+                    # Prepare metadata for each chunk
+                    chunk_metadata = {
+                        "chunk_index": i,
+                        "chunk_length": len(chunk),
+                        "added_timestamp": time.time(),
+                        "doc_id": doc_id
+                    }
+                    
+                    # Add provided metadata
+                    if metadata:
+                        chunk_metadata.update(metadata)
+                    
+                    metadatas.append(chunk_metadata)
                 
-                # Add provided metadata
-                if metadata:
-                    chunk_metadata.update(metadata)
+                # Add documents to ChromaDB collection
+                self.collection.add(
+                    documents=chunks,
+                    embeddings=embeddings,
+                    ids=ids,
+                    metadatas=metadatas
+                )
                 
-                metadatas.append(chunk_metadata)
-            
-            # Add documents to ChromaDB collection
-            self.collection.add(
-                documents=chunks,
-                ids=ids,
-                metadatas=metadatas
-            )
-            
-            # Update stats
-            self.doc_count += len(chunks)
-            self.stats["documents_added"] += 1
-            self.stats["total_chunks"] += len(chunks)
-            self.stats["last_updated"] = time.time()
+                # Update stats
+                self.doc_count += len(chunks)
+                self.stats["documents_added"] += 1
+                self.stats["total_chunks"] += len(chunks)
+                self.stats["last_updated"] = time.time()
             
             logger.info(f"Successfully added {len(chunks)} chunks to vector store")
             
@@ -86,14 +103,19 @@ class VectorStore:
             logger.error(f"Error adding documents to vector store: {str(e)}", exc_info=True)
             raise
     
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts (such as queries) with the collection's embedding function, bypassing the cache"""
+        return self.sentence_transformer_ef(texts)
+    
     def search(self, query: str, k: int = 5) -> List[str]:
         """Basic search returning only document text"""
         results = self.search_with_metadata(query, k)
         return [result["document"] for result in results]
     
     def search_with_metadata(self, query: str, k: int = 5, 
-                           where_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Enhanced search returning documents with metadata and scores"""
+                           where_filter: Optional[Dict[str, Any]] = None,
+                           query_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        """Enhanced search returning documents with metadata and scores (reusing query_embedding if given)"""
         try:
             # Check if collection is empty
             collection_count = self.collection.count()
@@ -103,11 +125,15 @@ class VectorStore:
             
             # Prepare query parameters
             query_params = {
-                "query_texts": [query],
                 "n_results": min(k, collection_count),
                 "include": ["documents", "metadatas", "distances"]
             }
             
+            if query_embedding is not None:
+                query_params["query_embeddings"] = [query_embedding]
+            else:
+                query_params["query_texts"] = [query]
+            
             # Add where filter if provided
             if where_filter:
                 query_params["where"] = where_filter
@@ -119,25 +145,11 @@ class VectorStore:
             self.stats["searches_performed"] += 1
             
             # Process results
-            if not results['documents'] or not results['documents'][0]:
+            search_results = self._build_search_results(results, 0)
+            if not search_results:
                 logger.info(f"No results found for query: {query}")
                 return []
             
-            # Combine documents, metadata, and distances
-            search_results = []
-            documents = results['documents'][0]
-            metadatas = results.get('metadatas', [[]])[0]
-            distances = results.get('distances', [[]])[0]
-            
-            for i, doc in enumerate(documents):
-                result = {
-                    "document": doc,
-                    "metadata": metadatas[i] if i < len(metadatas) else {},
-                    "distance": distances[i] if i < len(distances) else 1.0,
-                    "similarity": 1.0 - (distances[i] if i < len(distances) else 1.0)  # Convert distance to similarity
-                }
-                search_results.append(result)
-            
             logger.info(f"Found {len(search_results)} results for query: {query[:50]}...")
             return search_results
             
@@ -145,6 +157,65 @@ class VectorStore:
             logger.error(f"Error searching vector store: {str(e)}", exc_info=True)
             return []
     
+    def search_batch_with_metadata(self, queries: List[str], k: int = 5,
+                                   where_filter: Optional[Dict[str, Any]] = None,
+                                   query_embeddings: Optional[List[List[float]]] = None) -> List[List[Dict[str, Any]]]:
+        """Search for several queries at once, embedding them in a single batch (reusing query_embeddings if given)"""
+        try:
+            collection_count = self.collection.count()
+            if not queries or collection_count == 0:
+                return [[] for _ in queries]
+            
+            # Embed every query in one call so the model sees a single batch
+            if query_embeddings is None:
+                query_embeddings = self.sentence_transformer_ef(queries)
+            
+            query_params = {
+                "query_embeddings": query_embeddings,
+                "n_results": min(k, collection_count),
+                "include": ["documents", "metadatas", "distances"]
+            }
+            
+            if where_filter:
+                query_params["where"] = where_filter
+            
+            results = self.collection.query(**query_params)
+            
+            # Update stats
+            self.stats["searches_performed"] += len(queries)
+            
+            batch_results = [self._build_search_results(results, i) for i in range(len(queries))]
+            
+            logger.info(f"Batch search returned results for {sum(1 for r in batch_results if r)} of {len(queries)} queries")
+            return batch_results
+            
+        except Exception as e:
+            logger.error(f"Error batch searching vector store: {str(e)}", exc_info=True)
+            return [[] for _ in queries]
+    
+    def _build_search_results(self, results: Dict[str, Any], query_index: int) -> List[Dict[str, Any]]:
+        """Combine documents, metadata, and distances for one query of a ChromaDB result"""
+        if not results['documents'] or not results['documents'][query_index]:
+            return []
+        
+        search_results = []
+        documents = results['documents'][query_index]
+        metadatas = (results.get('metadatas') or [])[query_index:query_index + 1]
+        metadatas = metadatas[0] if metadatas else []
+        distances = (results.get('distances') or [])[query_index:query_index + 1]
+        distances = distances[0] if distances else []
+        
+        for i, doc in enumerate(documents):
+            result = {
+                "document": doc,
+                "metadata": metadatas[i] if i < len(metadatas) else {},
+                "distance": distances[i] if i < len(distances) else 1.0,
+                "similarity": 1.0 - (distances[i] if i < len(distances) else 1.0)  # Convert distance to similarity
+            }
+            search_results.append(result)
+        
+        return search_results
+    
     def search_by_file(self, query: str, file_path: str, k: int = 5) -> List[Dict[str, Any]]:
         """Search within documents from a specific file"""
         where_filter = {"file_path": file_path}
@@ -197,28 +268,30 @@ class VectorStore:
         """Get vector store statistics"""
         return {
             **self.stats,
-            "current_count": self.collection.count()
+            "current_count": self.collection.count(),
+            "embedding_cache": self.embedding_cache.get_stats()
         }
     
     def clear_collection(self):
         """Clear all documents from the collection"""
         try:
-            # Delete the collection and recreate it
-            self.client.delete_collection(name=self.collection_name)
-            
-            self.collection = self.client.get_or_create_collection(
-                name=self.collection_name,
-                embedding_function=self.sentence_transformer_ef
-            )
-            
-            # Reset counters
-            self.doc_count = 0
-            self.stats = {
-                "documents_added": 0,
-                "searches_performed": 0,
-                "total_chunks": 0,
-                "last_updated": time.time()
-            }
+            with self._add_lock:
+                # Delete the collection and recreate it
+                self.client.delete_collection(name=self.collection_name)
+                
+                self.collection = self.client.get_or_create_collection(
+                    name=self.collection_name,
+                    embedding_function=self.sentence_transformer_ef
+                )
+                
+                # Reset counters
+                self.doc_count = 0
+                self.stats = {
+                    "documents_added": 0,
+                    "searches_performed": 0,
+                    "total_chunks": 0,
+                    "last_updated": time.time()
+                }
             
             logger.info("Vector store collection cleared successfully")
             
@@ -226,6 +299,14 @@ class VectorStore:
             logger.error(f"Error clearing collection: {str(e)}", exc_info=True)
             raise
     
+    def clear_embedding_cache(self):
+        """Clear all cached embeddings"""
+        try:
+            self.embedding_cache.clear()
+        except Exception as e:
+            logger.error(f"Error clearing embedding cache: {str(e)}", exc_info=True)
+            raise
+    
     def delete_documents_by_file(self, file_path: str) -> int:
         """Delete all documents from a specific file"""
         try: